@@ -14,7 +14,9 @@ Usage:
 import argparse
 import logging
 import os
+import select
 import signal
+import socket
 import sys
 import threading
 from pathlib import Path
@@ -32,12 +34,31 @@ def run_monitor(config_path, stop_event):
     monitor = FileMonitor(config_path=config_path)
     monitor.start()
     try:
-        while not stop_event.is_set():
-            stop_event.wait(timeout=1.0)
+        stop_event.wait()
     finally:
         monitor.stop()
 
 
+def wait_for_shutdown(stop_event):
+    """Block the main thread until a signal handler sets stop_event.
+
+    Signals are delivered through a wakeup socket, so the thread sleeps in
+    select() with no periodic polling and wakes as soon as a signal lands.
+    A socket pair is used rather than a pipe so this also works on Windows.
+    """
+    rsock, wsock = socket.socketpair()
+    wsock.setblocking(False)
+    old_fd = signal.set_wakeup_fd(wsock.fileno())
+    try:
+        while not stop_event.is_set():
+            select.select([rsock], [], [])
+            rsock.recv(64)
+    finally:
+        signal.set_wakeup_fd(old_fd)
+        rsock.close()
+        wsock.close()
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Ransomware Detection System",
@@ -100,8 +121,7 @@ def main():
         monitor = FileMonitor(config_path=args.config)
         monitor.start()
         try:
-            while not stop_event.is_set():
-                stop_event.wait(timeout=1.0)
+            wait_for_shutdown(stop_event)
         finally:
             monitor.stop()
         return
@@ -8,6 +8,7 @@ This is the single entry-point that the file monitor calls for every event.
 """
 
 import logging
+import threading
 import time
 
 from src.analysis.pattern_detector import PatternDetector, FileEvent
@@ -40,6 +41,17 @@ class BehaviorAnalyzer:
     on_threat:
         Optional callback invoked with a ``ThreatScore`` whenever a process
         reaches the CRITICAL level (score >= 71).
+    async_evaluation:
+        When True, ``process_event`` only records the event and returns
+        None; indicator evaluation and scoring run on a background worker
+        thread, so the caller (the monitor's event thread) is not held up
+        during bursts. Results arrive through ``on_threat`` and
+        ``get_score``.
+        Pending PIDs are coalesced and each pass is followed by a pause of
+        ``min_eval_interval`` seconds, so a burst is scored a few times
+        rather than once per event.
+    min_eval_interval:
+        Seconds between evaluation passes in async mode (default 0.05).
     """
 
     def __init__(
@@ -51,6 +63,8 @@ class BehaviorAnalyzer:
         extension_change_min_files: int = 3,
         directory_traversal_min_dirs: int = 4,
         on_threat=None,
+        async_evaluation: bool = False,
+        min_eval_interval: float = 0.05,
     ):
         self.detector = PatternDetector(
             time_window=time_window,
@@ -63,6 +77,28 @@ class BehaviorAnalyzer:
         self.on_threat = on_threat
         # Most recent ThreatScore per pid, for external queries
         self._latest_scores: dict[int | None, ThreatScore] = {}
+        # API form of each latest score, rebuilt only when it changes
+        self._score_dicts: dict[int | None, dict] = {}
+        # Bumped whenever a published score differs from the previous one
+        self._scores_version = 0
+        # Number of processes whose latest score is at each level
+        self._level_counts: dict[str, int] = {}
+        # Guards the detector, which the worker and event threads share
+        self._lock = threading.Lock()
+
+        self.async_evaluation = async_evaluation
+        self.min_eval_interval = min_eval_interval
+        self._worker: threading.Thread | None = None
+        if async_evaluation:
+            # PIDs with unscored events; a dict keeps arrival order and
+            # collapses repeats, so it is bounded by the number of processes
+            self._pending_pids: dict[int | None, None] = {}
+            self._pending_cond = threading.Condition()
+            self._stopped = threading.Event()
+            self._worker = threading.Thread(
+                target=self._evaluation_loop, name="behavior-analyzer", daemon=True,
+            )
+            self._worker.start()
 
     # ------------------------------------------------------------------
     # Event ingestion
@@ -78,14 +114,17 @@ class BehaviorAnalyzer:
         process_name: str | None = None,
         entropy_delta: float | None = None,
         entropy_after: float | None = None,
-    ) -> ThreatScore:
+    ) -> ThreatScore | None:
         """Ingest a single file-system event and return the updated threat score.
 
         This method is designed to be called in real-time from the monitor
-        layer for every captured event.
+        layer for every captured event. In async mode the event is only
+        queued for scoring and None is returned; use ``on_threat``, or
+        ``get_score`` after ``flush()``, to see the result.
         """
+        now = time.time()
         event = FileEvent(
-            timestamp=time.time(),
+            timestamp=now,
             event_type=event_type,
             file_path=file_path,
             file_extension=file_extension,
@@ -96,26 +135,107 @@ class BehaviorAnalyzer:
             entropy_after=entropy_after,
         )
 
-        self.detector.record_event(event)
-        indicators = self.detector.evaluate(process_id)
+        if self.async_evaluation:
+            with self._lock:
+                self.detector.record_event(event, now=now)
+            with self._pending_cond:
+                self._pending_pids[process_id] = None
+                self._pending_cond.notify()
+            return None
+
+        with self._lock:
+            self.detector.record_event(event, now=now)
+        return self._score(process_id, process_name, now)
+
+    def _score(self, pid: int | None, process_name: str | None,
+               now: float | None = None) -> ThreatScore:
+        """Evaluate indicators for a process and publish the new score."""
+        with self._lock:
+            indicators = self.detector.evaluate(pid, now=now)
 
         score = calculate_threat_score(
             indicators,
-            process_id=process_id,
+            process_id=pid,
             process_name=process_name,
         )
 
-        self._latest_scores[process_id] = score
+        with self._lock:
+            prev = self._latest_scores.get(pid)
+            self._latest_scores[pid] = score
+            if prev is None or prev.level != score.level:
+                counts = self._level_counts
+                if prev is not None:
+                    counts[prev.level] -= 1
+                counts[score.level] = counts.get(score.level, 0) + 1
+            if (prev is None or prev.score != score.score or prev.level != score.level
+                    or prev.process_name != score.process_name):
+                self._score_dicts[pid] = {
+                    "score": score.score,
+                    "level": score.level,
+                    "process_name": score.process_name,
+                }
+                self._scores_version += 1
 
         if score.action_required and self.on_threat:
             self.on_threat(score)
 
         return score
 
+    # ------------------------------------------------------------------
+    # Async evaluation
+    # ------------------------------------------------------------------
+
+    def _take_pending(self) -> list[int | None]:
+        with self._pending_cond:
+            pids = list(self._pending_pids)
+            self._pending_pids.clear()
+        return pids
+
+    def _score_pending(self):
+        for pid in self._take_pending():
+            tracker = self.detector._trackers.get(pid)
+            try:
+                self._score(pid, tracker.process_name if tracker else None)
+            except Exception:
+                logger.exception("Error scoring events for pid %s", pid)
+
+    def _evaluation_loop(self):
+        while True:
+            with self._pending_cond:
+                while not self._pending_pids and not self._stopped.is_set():
+                    self._pending_cond.wait()
+            if self._stopped.is_set():
+                return
+            self._score_pending()
+            # Let a burst accumulate before the next pass
+            if self._stopped.wait(self.min_eval_interval):
+                return
+
+    def flush(self):
+        """Score any queued events now, on the calling thread (async mode)."""
+        if self.async_evaluation:
+            self._score_pending()
+
+    def close(self):
+        """Stop the async worker after scoring whatever is still queued."""
+        if self._worker is None:
+            return
+        with self._pending_cond:
+            self._stopped.set()
+            self._pending_cond.notify()
+        self._worker.join(timeout=5)
+        self._worker = None
+        self._score_pending()
+
     # ------------------------------------------------------------------
     # Query helpers
     # ------------------------------------------------------------------
 
+    @property
+    def scores_version(self) -> int:
+        """Counter that changes whenever any process's score or level changes."""
+        return self._scores_version
+
     def get_score(self, pid: int | None) -> ThreatScore | None:
         """Return the most recent threat score for a process."""
         return self._latest_scores.get(pid)
@@ -124,6 +244,18 @@ class BehaviorAnalyzer:
         """Return latest scores for all tracked processes."""
         return dict(self._latest_scores)
 
+    def get_all_score_dicts(self) -> dict[int | None, dict]:
+        """Return ``{"score", "level", "process_name"}`` dicts for all processes.
+
+        The dicts are shared between calls and must not be modified.
+        """
+        return dict(self._score_dicts)
+
+    def count_by_level(self) -> dict[str, int]:
+        """Return how many processes are currently at each threat level."""
+        with self._lock:
+            return {level: n for level, n in self._level_counts.items() if n}
+
     def get_critical_processes(self) -> list[ThreatScore]:
         """Return scores for all processes currently at CRITICAL level."""
         return [s for s in self._latest_scores.values() if s.action_required]
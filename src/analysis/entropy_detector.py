@@ -4,22 +4,36 @@ Maintains a baseline entropy database, compares before/after values on file
 modification events, and flags suspicious entropy spikes (delta > threshold).
 """
 
+import itertools
 import sqlite3
 import threading
 import logging
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
 
-from src.analysis.entropy_analyzer import calculate_file_entropy
+from src.analysis.entropy_analyzer import file_entropy_and_size
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_DELTA_THRESHOLD = 2.0
 HIGH_ENTROPY_ABSOLUTE = 7.5
+DEFAULT_CACHE_SIZE = 10_000
+
+# Buffered writes are committed once this many are pending, or after
+# FLUSH_INTERVAL seconds, whichever comes first
+FLUSH_BATCH_SIZE = 200
+FLUSH_INTERVAL = 0.5
 
 
 class EntropyBaseline:
-    """Thread-safe store for per-file entropy baselines."""
+    """Thread-safe store for per-file entropy baselines.
+
+    Writes are buffered in memory and committed in batches by a background
+    writer thread, so the file-event path never waits on a commit. Reads
+    see buffered writes immediately; ``flush()`` forces a commit. Alert row
+    IDs are allocated up front, which assumes one writer per database.
+    """
 
     def __init__(self, db_path: str):
         self.db_path = Path(db_path)
@@ -27,14 +41,37 @@ class EntropyBaseline:
         self._local = threading.local()
         self._init_db()
 
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        # file_path -> (entropy, updated_at), or None for a pending delete.
+        # "inflight" holds the batch currently being committed.
+        self._pending_baselines: dict[str, tuple[float, str] | None] = {}
+        self._inflight_baselines: dict[str, tuple[float, str] | None] = {}
+        self._pending_alerts: list[tuple] = []
+        max_id = self._get_connection().execute(
+            "SELECT COALESCE(MAX(id), 0) FROM entropy_alerts"
+        ).fetchone()[0]
+        self._alert_ids = itertools.count(max_id + 1)
+
+        self._flush_requested = threading.Event()
+        self._closed = threading.Event()
+        self._writer = threading.Thread(
+            target=self._writer_loop, name="entropy-baseline-writer", daemon=True,
+        )
+        self._writer.start()
+
     def _get_connection(self) -> sqlite3.Connection:
         if not hasattr(self._local, "connection") or self._local.connection is None:
+            # Larger statement cache so the fixed set of queries below is
+            # never re-parsed
             self._local.connection = sqlite3.connect(
-                str(self.db_path), timeout=10
+                str(self.db_path), timeout=10, cached_statements=256,
             )
             self._local.connection.row_factory = sqlite3.Row
             self._local.connection.execute("PRAGMA journal_mode=WAL")
             self._local.connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection.execute("PRAGMA temp_store=MEMORY")
+            self._local.connection.execute("PRAGMA mmap_size=268435456")
         return self._local.connection
 
     def _init_db(self):
@@ -63,7 +100,76 @@ class EntropyBaseline:
         """)
         conn.commit()
 
+    # ------------------------------------------------------------------
+    # Buffered writes
+    # ------------------------------------------------------------------
+
+    def _writer_loop(self):
+        while not self._closed.is_set():
+            self._flush_requested.wait(FLUSH_INTERVAL)
+            self._flush_requested.clear()
+            try:
+                self.flush()
+            except sqlite3.Error:
+                logger.exception("Failed to flush entropy baselines")
+        self._close_connection()
+
+    def _buffered(self) -> int:
+        return len(self._pending_baselines) + len(self._pending_alerts)
+
+    def flush(self):
+        """Commit all buffered writes to the database."""
+        with self._flush_lock:
+            with self._pending_lock:
+                baselines = self._pending_baselines
+                alerts = self._pending_alerts
+                self._pending_baselines = {}
+                self._pending_alerts = []
+                self._inflight_baselines = baselines
+            if not baselines and not alerts:
+                return
+            conn = None
+            try:
+                conn = self._get_connection()
+                conn.executemany(
+                    "DELETE FROM entropy_baselines WHERE file_path = ?",
+                    [(path,) for path, entry in baselines.items() if entry is None],
+                )
+                conn.executemany(
+                    """INSERT INTO entropy_baselines (file_path, entropy, updated_at)
+                       VALUES (?, ?, ?)
+                       ON CONFLICT(file_path) DO UPDATE
+                       SET entropy = excluded.entropy, updated_at = excluded.updated_at""",
+                    [(path, *entry) for path, entry in baselines.items() if entry is not None],
+                )
+                conn.executemany(
+                    """INSERT INTO entropy_alerts
+                       (id, timestamp, file_path, entropy_before, entropy_after,
+                        delta, suspicious)
+                       VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                    alerts,
+                )
+                conn.commit()
+            except BaseException:
+                # Undo the partial batch and put it back ahead of anything
+                # buffered since, so the next flush retries it
+                if conn is not None:
+                    conn.rollback()
+                with self._pending_lock:
+                    baselines.update(self._pending_baselines)
+                    self._pending_baselines = baselines
+                    self._pending_alerts = alerts + self._pending_alerts
+                raise
+            finally:
+                with self._pending_lock:
+                    self._inflight_baselines = {}
+
     def get_baseline(self, file_path: str) -> float | None:
+        with self._pending_lock:
+            for buffered in (self._pending_baselines, self._inflight_baselines):
+                if file_path in buffered:
+                    entry = buffered[file_path]
+                    return entry[0] if entry is not None else None
         conn = self._get_connection()
         row = conn.execute(
             "SELECT entropy FROM entropy_baselines WHERE file_path = ?",
@@ -72,22 +178,16 @@ class EntropyBaseline:
         return row["entropy"] if row else None
 
     def set_baseline(self, file_path: str, entropy: float):
-        conn = self._get_connection()
-        conn.execute(
-            """INSERT INTO entropy_baselines (file_path, entropy, updated_at)
-               VALUES (?, ?, ?)
-               ON CONFLICT(file_path) DO UPDATE
-               SET entropy = excluded.entropy, updated_at = excluded.updated_at""",
-            (file_path, entropy, datetime.now().isoformat()),
-        )
-        conn.commit()
+        with self._pending_lock:
+            self._pending_baselines[file_path] = (entropy, datetime.now().isoformat())
+            if self._buffered() >= FLUSH_BATCH_SIZE:
+                self._flush_requested.set()
 
     def remove_baseline(self, file_path: str):
-        conn = self._get_connection()
-        conn.execute(
-            "DELETE FROM entropy_baselines WHERE file_path = ?", (file_path,)
-        )
-        conn.commit()
+        with self._pending_lock:
+            self._pending_baselines[file_path] = None
+            if self._buffered() >= FLUSH_BATCH_SIZE:
+                self._flush_requested.set()
 
     def log_alert(
         self,
@@ -97,24 +197,24 @@ class EntropyBaseline:
         delta: float,
         suspicious: bool,
     ) -> int:
-        conn = self._get_connection()
-        cursor = conn.execute(
-            """INSERT INTO entropy_alerts
-               (timestamp, file_path, entropy_before, entropy_after, delta, suspicious)
-               VALUES (?, ?, ?, ?, ?, ?)""",
-            (
+        """Buffer an alert row and return the ID it will be stored under."""
+        with self._pending_lock:
+            alert_id = next(self._alert_ids)
+            self._pending_alerts.append((
+                alert_id,
                 datetime.now().isoformat(),
                 file_path,
                 entropy_before,
                 entropy_after,
                 delta,
                 int(suspicious),
-            ),
-        )
-        conn.commit()
-        return cursor.lastrowid
+            ))
+            if self._buffered() >= FLUSH_BATCH_SIZE:
+                self._flush_requested.set()
+        return alert_id
 
     def get_alerts(self, suspicious_only: bool = False, limit: int = 100) -> list[dict]:
+        self.flush()
         conn = self._get_connection()
         query = "SELECT * FROM entropy_alerts"
         params: list = []
@@ -125,11 +225,20 @@ class EntropyBaseline:
         rows = conn.execute(query, params).fetchall()
         return [dict(row) for row in rows]
 
-    def close(self):
+    def _close_connection(self):
         if hasattr(self._local, "connection") and self._local.connection:
             self._local.connection.close()
             self._local.connection = None
 
+    def close(self):
+        """Stop the writer thread, commit outstanding writes and close."""
+        self._closed.set()
+        self._flush_requested.set()
+        if self._writer.is_alive() and self._writer is not threading.current_thread():
+            self._writer.join(timeout=5)
+        self.flush()
+        self._close_connection()
+
 
 class EntropyDetector:
     """Detects suspicious entropy changes on file modification events."""
@@ -138,27 +247,55 @@ class EntropyDetector:
         self,
         baseline_db_path: str,
         delta_threshold: float = DEFAULT_DELTA_THRESHOLD,
+        cache_size: int = DEFAULT_CACHE_SIZE,
     ):
         self.baseline = EntropyBaseline(baseline_db_path)
         self.delta_threshold = delta_threshold
-        self._cache: dict[str, float] = {}
+        # Most recently seen entropies, least recently used first
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, float] = OrderedDict()
+
+    def _cache_get(self, file_path: str) -> float | None:
+        entropy = self._cache.get(file_path)
+        if entropy is not None:
+            self._cache.move_to_end(file_path)
+        return entropy
+
+    def _cache_put(self, file_path: str, entropy: float):
+        self._cache[file_path] = entropy
+        self._cache.move_to_end(file_path)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
 
     def analyze_file(self, file_path: str) -> dict | None:
         """Calculate entropy and compare against baseline.
 
         Returns a result dict with keys:
-            file_path, entropy_before, entropy_after, delta, suspicious
+            file_path, entropy_before, entropy_after, delta, suspicious,
+            file_size
         or None if the file cannot be read.
         """
-        entropy_after = calculate_file_entropy(file_path)
+        entropy_after, file_size = file_entropy_and_size(file_path)
         if entropy_after is None:
             return None
 
         # Check cache first, then database baseline
-        entropy_before = self._cache.get(file_path)
+        entropy_before = self._cache_get(file_path)
         if entropy_before is None:
             entropy_before = self.baseline.get_baseline(file_path)
 
+        if file_size == 0:
+            # Usually a save caught between truncate and write; an empty
+            # file says nothing, so keep the baseline for the real content
+            return {
+                "file_path": file_path,
+                "entropy_before": entropy_before,
+                "entropy_after": entropy_after,
+                "delta": 0.0,
+                "suspicious": False,
+                "file_size": file_size,
+            }
+
         delta = (entropy_after - entropy_before) if entropy_before is not None else 0.0
         suspicious = (
             delta >= self.delta_threshold
@@ -167,8 +304,10 @@ class EntropyDetector:
 
         # Update baseline and cache
         self.baseline.set_baseline(file_path, entropy_after)
-        self._cache[file_path] = entropy_after
+        self._cache_put(file_path, entropy_after)
 
+        # Only suspicious changes are recorded; the baseline already holds
+        # the latest value for normal edits
         if suspicious:
             self.baseline.log_alert(
                 file_path=file_path,
@@ -184,14 +323,6 @@ class EntropyDetector:
                 entropy_after,
                 delta,
             )
-        else:
-            self.baseline.log_alert(
-                file_path=file_path,
-                entropy_before=entropy_before,
-                entropy_after=entropy_after,
-                delta=delta,
-                suspicious=False,
-            )
 
         return {
             "file_path": file_path,
@@ -199,15 +330,18 @@ class EntropyDetector:
             "entropy_after": entropy_after,
             "delta": delta,
             "suspicious": suspicious,
+            "file_size": file_size,
         }
 
     def on_file_created(self, file_path: str) -> dict | None:
         """Record initial baseline entropy for a new file."""
-        entropy = calculate_file_entropy(file_path)
+        entropy, file_size = file_entropy_and_size(file_path)
         if entropy is None:
             return None
-        self.baseline.set_baseline(file_path, entropy)
-        self._cache[file_path] = entropy
+        if file_size:
+            # An empty file is not a baseline; its first content will be
+            self.baseline.set_baseline(file_path, entropy)
+            self._cache_put(file_path, entropy)
         suspicious = entropy >= HIGH_ENTROPY_ABSOLUTE
         if suspicious:
             self.baseline.log_alert(
@@ -223,6 +357,7 @@ class EntropyDetector:
             "entropy_after": entropy,
             "delta": 0.0,
             "suspicious": suspicious,
+            "file_size": file_size,
         }
 
     def on_file_deleted(self, file_path: str):
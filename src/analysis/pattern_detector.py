@@ -17,8 +17,9 @@ Secondary:
 import logging
 import os
 import time
-from collections import defaultdict
+from collections import Counter, defaultdict, deque
 from dataclasses import dataclass, field
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
@@ -34,7 +35,14 @@ TEMP_DIR_MARKERS = frozenset({
 })
 
 
-@dataclass
+@lru_cache(maxsize=4096)
+def _is_temp_dir(directory: str) -> bool:
+    """True if any component of ``directory`` is a temp-dir marker."""
+    parts = directory.replace("\\", "/").lower().split("/")
+    return not TEMP_DIR_MARKERS.isdisjoint(parts)
+
+
+@dataclass(slots=True)
 class FileEvent:
     """Lightweight event record for in-memory pattern analysis."""
     timestamp: float
@@ -46,19 +54,38 @@ class FileEvent:
     process_name: str | None = None
     entropy_delta: float | None = None
     entropy_after: float | None = None
-
-
-@dataclass
+    # Derived from file_path once, since several checks need them per event
+    parent_dir: str = field(init=False, repr=False, compare=False)
+    stem: str = field(init=False, repr=False, compare=False)
+    suffix: str = field(init=False, repr=False, compare=False)  # lower-cased
+
+    def __post_init__(self):
+        # Extensions are compared case-insensitively; normalise them here
+        # rather than in every check
+        if self.file_extension:
+            self.file_extension = self.file_extension.lower()
+        self.parent_dir, basename = os.path.split(self.file_path)
+        self.stem, suffix = os.path.splitext(basename)
+        self.suffix = suffix.lower()
+
+
+@dataclass(slots=True)
 class ProcessTracker:
     """Accumulated event data for a single process within the time window."""
     process_id: int | None = None
     process_name: str | None = None
-    modified_files: list[FileEvent] = field(default_factory=list)
-    created_files: list[FileEvent] = field(default_factory=list)
-    deleted_files: list[FileEvent] = field(default_factory=list)
-    renamed_files: list[FileEvent] = field(default_factory=list)
-    extension_changed_files: list[FileEvent] = field(default_factory=list)
-    directories_touched: set[str] = field(default_factory=set)
+    modified_files: deque[FileEvent] = field(default_factory=deque)
+    created_files: deque[FileEvent] = field(default_factory=deque)
+    deleted_files: deque[FileEvent] = field(default_factory=deque)
+    renamed_files: deque[FileEvent] = field(default_factory=deque)
+    extension_changed_files: deque[FileEvent] = field(default_factory=deque)
+    # parent directory -> number of in-window events there
+    directories_touched: Counter[str] = field(default_factory=Counter)
+    # Running counts kept in step with the queues above so the checks
+    # don't rescan them on every evaluation
+    entropy_spike_count: int = 0
+    suspicious_rename_count: int = 0
+    temp_dir_event_count: int = 0
 
 
 class PatternDetector:
@@ -85,28 +112,33 @@ class PatternDetector:
 
         # process_id -> ProcessTracker
         self._trackers: dict[int | None, ProcessTracker] = defaultdict(ProcessTracker)
-        # process_id -> list[FileEvent] (chronological)
-        self._events: dict[int | None, list[FileEvent]] = defaultdict(list)
+        # process_id -> deque[FileEvent] (chronological)
+        self._events: dict[int | None, deque[FileEvent]] = defaultdict(deque)
 
     # ------------------------------------------------------------------
     # Event ingestion
     # ------------------------------------------------------------------
 
-    def record_event(self, event: FileEvent):
-        """Record a new file event and prune stale entries."""
+    def record_event(self, event: FileEvent, now: float | None = None):
+        """Record a new file event and prune stale entries.
+
+        ``now`` is the current time if the caller already has it; otherwise
+        the clock is read once here.
+        """
         pid = event.process_id
         self._events[pid].append(event)
-        self._prune(pid)
 
         tracker = self._trackers[pid]
         tracker.process_id = pid
         tracker.process_name = event.process_name
-
-        parent_dir = os.path.dirname(event.file_path)
-        tracker.directories_touched.add(parent_dir)
+        tracker.directories_touched[event.parent_dir] += 1
+        if _is_temp_dir(event.parent_dir):
+            tracker.temp_dir_event_count += 1
 
         if event.event_type == "modified":
             tracker.modified_files.append(event)
+            if self._is_entropy_spike(event):
+                tracker.entropy_spike_count += 1
         elif event.event_type == "created":
             tracker.created_files.append(event)
         elif event.event_type == "deleted":
@@ -115,26 +147,52 @@ class PatternDetector:
             tracker.renamed_files.append(event)
         elif event.event_type == "extension_changed":
             tracker.extension_changed_files.append(event)
+            if self._is_suspicious_rename(event):
+                tracker.suspicious_rename_count += 1
 
-    def _prune(self, pid: int | None):
+        self._prune(pid, now)
+
+    def _prune(self, pid: int | None, now: float | None = None):
         """Remove events older than the time window."""
-        cutoff = time.time() - self.time_window
+        cutoff = (time.time() if now is None else now) - self.time_window
         events = self._events[pid]
-        while events and events[0].timestamp < cutoff:
-            events.pop(0)
-
         tracker = self._trackers[pid]
-        tracker.modified_files = [e for e in tracker.modified_files if e.timestamp >= cutoff]
-        tracker.created_files = [e for e in tracker.created_files if e.timestamp >= cutoff]
-        tracker.deleted_files = [e for e in tracker.deleted_files if e.timestamp >= cutoff]
-        tracker.renamed_files = [e for e in tracker.renamed_files if e.timestamp >= cutoff]
-        tracker.extension_changed_files = [
-            e for e in tracker.extension_changed_files if e.timestamp >= cutoff
-        ]
-        # Rebuild directories_touched from surviving events
-        tracker.directories_touched = {
-            os.path.dirname(e.file_path) for e in self._events[pid]
-        }
+        dirs = tracker.directories_touched
+        while events and events[0].timestamp < cutoff:
+            parent_dir = events.popleft().parent_dir
+            dirs[parent_dir] -= 1
+            if dirs[parent_dir] <= 0:
+                del dirs[parent_dir]
+            if _is_temp_dir(parent_dir):
+                tracker.temp_dir_event_count -= 1
+
+        # Per-type queues are chronological too, so stale entries are all
+        # at the left end
+        modified = tracker.modified_files
+        while modified and modified[0].timestamp < cutoff:
+            if self._is_entropy_spike(modified.popleft()):
+                tracker.entropy_spike_count -= 1
+        renamed_ext = tracker.extension_changed_files
+        while renamed_ext and renamed_ext[0].timestamp < cutoff:
+            if self._is_suspicious_rename(renamed_ext.popleft()):
+                tracker.suspicious_rename_count -= 1
+        for queue in (
+            tracker.created_files,
+            tracker.deleted_files,
+            tracker.renamed_files,
+        ):
+            while queue and queue[0].timestamp < cutoff:
+                queue.popleft()
+
+    def _is_entropy_spike(self, event: FileEvent) -> bool:
+        return (
+            event.entropy_delta is not None
+            and event.entropy_delta >= self.entropy_spike_threshold
+        )
+
+    @staticmethod
+    def _is_suspicious_rename(event: FileEvent) -> bool:
+        return event.file_extension in SUSPICIOUS_EXTENSIONS
 
     # ------------------------------------------------------------------
     # Indicator evaluation  (returns triggered: bool, details: str)
@@ -155,12 +213,9 @@ class PatternDetector:
         tracker = self._trackers.get(pid)
         if not tracker:
             return False, ""
-        spikes = [
-            e for e in tracker.modified_files
-            if e.entropy_delta is not None and e.entropy_delta >= self.entropy_spike_threshold
-        ]
-        if len(spikes) >= self.entropy_spike_min_files:
-            return True, f"{len(spikes)} files with entropy spike by pid {pid}"
+        count = tracker.entropy_spike_count
+        if count >= self.entropy_spike_min_files:
+            return True, f"{count} files with entropy spike by pid {pid}"
         return False, ""
 
     def check_extension_manipulation(self, pid: int | None) -> tuple[bool, str]:
@@ -168,13 +223,13 @@ class PatternDetector:
         tracker = self._trackers.get(pid)
         if not tracker:
             return False, ""
-        suspicious = [
-            e for e in tracker.extension_changed_files
-            if e.file_extension and e.file_extension.lower() in SUSPICIOUS_EXTENSIONS
-        ]
-        if len(suspicious) >= self.extension_change_min_files:
-            exts = {e.file_extension for e in suspicious}
-            return True, f"{len(suspicious)} files renamed to {exts} by pid {pid}"
+        count = tracker.suspicious_rename_count
+        if count >= self.extension_change_min_files:
+            exts = {
+                e.file_extension for e in tracker.extension_changed_files
+                if self._is_suspicious_rename(e)
+            }
+            return True, f"{count} files renamed to {exts} by pid {pid}"
         return False, ""
 
     def check_directory_traversal(self, pid: int | None) -> tuple[bool, str]:
@@ -192,17 +247,11 @@ class PatternDetector:
         tracker = self._trackers.get(pid)
         if not tracker or not tracker.process_name:
             return False, ""
-        # Check if any event's process path contains temp directory markers
-        # We use directories_touched as a proxy; in production we'd check
-        # the process executable path via psutil.
-        events = self._events.get(pid, [])
-        if not events:
-            return False, ""
-        # Check based on process name heuristics and directories
-        for marker in TEMP_DIR_MARKERS:
-            for d in tracker.directories_touched:
-                if marker in d.lower():
-                    return True, f"Process pid {pid} ({tracker.process_name}) active in temp-like dir"
+        # Check if any in-window event landed in a directory with a temp
+        # marker component. We use touched directories as a proxy; in
+        # production we'd check the process executable path via psutil.
+        if tracker.temp_dir_event_count > 0:
+            return True, f"Process pid {pid} ({tracker.process_name}) active in temp-like dir"
         return False, ""
 
     def check_deletion_pattern(self, pid: int | None) -> tuple[bool, str]:
@@ -213,16 +262,13 @@ class PatternDetector:
         if not tracker.deleted_files or not tracker.created_files:
             return False, ""
 
-        deleted_stems = set()
-        for e in tracker.deleted_files:
-            stem, _ = os.path.splitext(os.path.basename(e.file_path))
-            deleted_stems.add(stem)
+        deleted_stems = {e.stem for e in tracker.deleted_files}
 
-        suspicious_creates = []
-        for e in tracker.created_files:
-            stem, ext = os.path.splitext(os.path.basename(e.file_path))
-            if ext and ext.lower() in SUSPICIOUS_EXTENSIONS and stem in deleted_stems:
-                suspicious_creates.append(e)
+        suspicious_creates = [
+            e for e in tracker.created_files
+            if e.suffix in SUSPICIOUS_EXTENSIONS
+            and e.stem in deleted_stems
+        ]
 
         if suspicious_creates:
             return True, (
@@ -234,12 +280,12 @@ class PatternDetector:
     # Public: evaluate all indicators for a process
     # ------------------------------------------------------------------
 
-    def evaluate(self, pid: int | None) -> dict[str, tuple[bool, str]]:
+    def evaluate(self, pid: int | None, now: float | None = None) -> dict[str, tuple[bool, str]]:
         """Run all six indicator checks for a given process.
 
         Returns a dict mapping indicator name to (triggered, detail_string).
         """
-        self._prune(pid)
+        self._prune(pid, now)
         return {
             "mass_modification": self.check_mass_modification(pid),
             "entropy_spike": self.check_entropy_spike(pid),
@@ -45,6 +45,16 @@ INDICATOR_WEIGHTS: dict[str, int] = {
     "deletion_pattern": WEIGHT_DELETION_PATTERN,
 }
 
+# Each indicator owns one bit; the clamped score for every combination of
+# triggered indicators is precomputed so scoring is a single table lookup
+INDICATOR_BITS: dict[str, int] = {
+    name: 1 << i for i, name in enumerate(INDICATOR_WEIGHTS)
+}
+_SCORE_TABLE: tuple[int, ...] = tuple(
+    min(sum(w for name, w in INDICATOR_WEIGHTS.items() if mask & INDICATOR_BITS[name]), 100)
+    for mask in range(1 << len(INDICATOR_WEIGHTS))
+)
+
 # Confidence-level thresholds
 THRESHOLD_NORMAL = 30
 THRESHOLD_SUSPICIOUS = 50
@@ -68,8 +78,7 @@ class ThreatScore:
     action_required: bool
 
 
-def classify_level(score: int) -> str:
-    """Map a numeric score to a confidence level string."""
+def _classify(score: int) -> str:
     if score >= THRESHOLD_CRITICAL:
         return LEVEL_CRITICAL
     if score >= THRESHOLD_SUSPICIOUS + 1:  # 51-70
@@ -79,6 +88,17 @@ def classify_level(score: int) -> str:
     return LEVEL_NORMAL
 
 
+# Level for every possible (clamped) score, indexed by score
+_LEVEL_TABLE: tuple[str, ...] = tuple(_classify(s) for s in range(101))
+
+
+def classify_level(score: int) -> str:
+    """Map a numeric score to a confidence level string."""
+    if 0 <= score <= 100:
+        return _LEVEL_TABLE[score]
+    return _classify(score)
+
+
 def calculate_threat_score(
     indicator_results: dict[str, tuple[bool, str]],
     process_id: int | None = None,
@@ -92,17 +112,17 @@ def calculate_threat_score(
         Dict of indicator_name -> (triggered, detail_string) as returned
         by ``PatternDetector.evaluate()``.
     """
-    raw_score = 0
+    mask = 0
     triggered: dict[str, str] = {}
 
     for name, (is_triggered, detail) in indicator_results.items():
         if is_triggered:
-            weight = INDICATOR_WEIGHTS.get(name, 0)
-            raw_score += weight
+            # Unknown indicators are reported but carry no weight
+            mask |= INDICATOR_BITS.get(name, 0)
             triggered[name] = detail
 
-    score = min(raw_score, 100)
-    level = classify_level(score)
+    score = _SCORE_TABLE[mask]
+    level = _LEVEL_TABLE[score]
     action_required = score >= THRESHOLD_CRITICAL
 
     if action_required:
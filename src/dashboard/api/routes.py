@@ -12,30 +12,51 @@ Implements the exact endpoints from the Phase 6 docs:
     PUT  /api/config          - Update configuration
 """
 
+import hashlib
 import json
 import logging
 import os
 import random
 import shutil
+import stat
+import tempfile
 import threading
 import time
 from datetime import datetime
 from pathlib import Path
+from types import SimpleNamespace
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request
 
 logger = logging.getLogger(__name__)
 
 api = Blueprint("api", __name__, url_prefix="/api")
 
-# These are set by app.py at init time via init_routes()
-_event_logger = None
-_backup_manager = None
-_response_engine = None
-_behavior_analyzer = None
-_config = None
-_config_path = None
-_ws_handler = None
+_MISSING = object()
+
+STATUS_TTL = 0.25  # seconds a serialized /api/status response is reused
+
+# Serializes PUT /api/config merges and writes
+_config_lock = threading.Lock()
+# Guards the status cache in _ctx
+_status_lock = threading.Lock()
+
+# Shared application state, filled in by app.py at init time via
+# init_routes(). Handlers bind it to a local on entry.
+_ctx = SimpleNamespace(
+    event_logger=None,
+    backup_manager=None,
+    response_engine=None,
+    behavior_analyzer=None,
+    config=None,
+    config_path=None,
+    ws_handler=None,
+    # (scores_version, threat_level, scores) last built by get_status
+    status_cache=None,
+    # (key, expires, body) of the last serialized /api/status response
+    status_body=None,
+    config_body=None,  # (serialized config, ETag), rebuilt after each change
+)
 
 
 def init_routes(
@@ -48,15 +69,16 @@ def init_routes(
     ws_handler,
 ):
     """Wire up shared application state into the route handlers."""
-    global _event_logger, _backup_manager, _response_engine
-    global _behavior_analyzer, _config, _config_path, _ws_handler
-    _event_logger = event_logger
-    _backup_manager = backup_manager
-    _response_engine = response_engine
-    _behavior_analyzer = behavior_analyzer
-    _config = config
-    _config_path = config_path
-    _ws_handler = ws_handler
+    _ctx.event_logger = event_logger
+    _ctx.backup_manager = backup_manager
+    _ctx.response_engine = response_engine
+    _ctx.behavior_analyzer = behavior_analyzer
+    _ctx.config = config
+    _ctx.config_path = config_path
+    _ctx.ws_handler = ws_handler
+    _ctx.status_cache = None
+    _ctx.status_body = None
+    _ctx.config_body = None
 
 
 # ------------------------------------------------------------------
@@ -65,33 +87,61 @@ def init_routes(
 
 @api.route("/status", methods=["GET"])
 def get_status():
-    """Current system status: health, threat level, monitored processes."""
+    """Current system status: health, threat level, monitored processes.
+
+    The serialized response is shared by all pollers for up to
+    ``STATUS_TTL`` seconds, as long as scores and the WebSocket counters
+    don't change, so its timestamp can lag by that much.
+    """
+    ctx = _ctx
+    version = ctx.behavior_analyzer.scores_version if ctx.behavior_analyzer else None
+    ws_clients = ctx.ws_handler.client_count if ctx.ws_handler else 0
+    ws_skipped = ctx.ws_handler.broadcasts_skipped if ctx.ws_handler else 0
+    key = (version, ws_clients, ws_skipped)
+    now = time.monotonic()
+
+    cached = ctx.status_body
+    if cached is not None and cached[0] == key and now < cached[1]:
+        return _cached_json(cached[2], cached[3])
+
     scores = {}
     threat_level = "NORMAL"
-    if _behavior_analyzer:
-        scores = {
-            str(pid): {
-                "score": ts.score,
-                "level": ts.level,
-                "process_name": ts.process_name,
-            }
-            for pid, ts in _behavior_analyzer.get_all_scores().items()
-        }
-        crits = _behavior_analyzer.get_critical_processes()
-        if crits:
-            threat_level = "CRITICAL"
-        elif any(s["level"] in ("LIKELY", "SUSPICIOUS") for s in scores.values()):
-            threat_level = "ELEVATED"
-
-    ws_clients = _ws_handler.client_count if _ws_handler else 0
+    if ctx.behavior_analyzer:
+        threat_level, scores = _status_scores(ctx)
 
-    return jsonify({
+    body = current_app.json.dumps({
         "status": "running",
         "timestamp": datetime.now().isoformat(),
         "threat_level": threat_level,
         "active_processes": scores,
         "websocket_clients": ws_clients,
-    })
+        "broadcasts_skipped": ws_skipped,
+    }) + "\n"
+    etag = _etag(body)
+    ctx.status_body = (key, now + STATUS_TTL, body, etag)
+    return _cached_json(body, etag)
+
+
+def _status_scores(ctx) -> tuple[str, dict]:
+    """Threat level and per-process scores, rebuilt only when scores change."""
+    analyzer = ctx.behavior_analyzer
+    with _status_lock:
+        current = analyzer.scores_version
+        cached = ctx.status_cache
+        if cached is not None and cached[0] == current:
+            return cached[1], cached[2]
+
+        scores = {
+            str(pid): d for pid, d in analyzer.get_all_score_dicts().items()
+        }
+        counts = analyzer.count_by_level()
+        threat_level = "NORMAL"
+        if counts.get("CRITICAL"):
+            threat_level = "CRITICAL"
+        elif counts.get("LIKELY", 0) + counts.get("SUSPICIOUS", 0) > 0:
+            threat_level = "ELEVATED"
+        ctx.status_cache = (current, threat_level, scores)
+        return threat_level, scores
 
 
 # ------------------------------------------------------------------
@@ -100,32 +150,62 @@ def get_status():
 
 @api.route("/events", methods=["GET"])
 def get_events():
-    """Recent file events, paginated."""
+    """Recent file events, paginated.
+
+    Pass the previous response's ``next_cursor`` as ``cursor`` to fetch the
+    next page; ``offset`` is still accepted but gets slower with depth.
+    ``total`` is only counted when ``include_total=1`` is given.
+    """
+    ctx = _ctx
     event_type = request.args.get("type")
     since = request.args.get("since")
     limit = request.args.get("limit", 50, type=int)
     offset = request.args.get("offset", 0, type=int)
+    cursor = request.args.get("cursor", type=int)
+    include_total = request.args.get("include_total") == "1"
+
+    if not ctx.event_logger:
+        empty = {"events": [], "has_more": False, "next_cursor": None}
+        if include_total:
+            empty["total"] = 0
+        return jsonify(empty)
 
-    if not _event_logger:
-        return jsonify({"events": [], "total": 0})
+    limit = max(0, limit)
+    offset = max(0, offset) if cursor is None else 0
 
     try:
-        events = _event_logger.get_events(
+        # One extra row tells us whether another page exists
+        events = ctx.event_logger.get_events(
             event_type=event_type,
             since=since,
-            limit=limit + offset,
+            limit=limit + 1,
+            offset=offset,
+            before_id=cursor,
         )
+        total = None
+        if include_total:
+            total = ctx.event_logger.count_events(
+                event_type=event_type,
+                since=since,
+            )
     except Exception as exc:
         logger.exception("Database error fetching events")
         return jsonify({"error": f"Database error: {exc}"}), 500
 
-    paginated = events[offset: offset + limit]
-    return jsonify({
-        "events": paginated,
-        "total": len(events),
+    has_more = len(events) > limit
+    if has_more:
+        del events[limit:]
+
+    body = {
+        "events": events,
+        "has_more": has_more,
         "limit": limit,
         "offset": offset,
-    })
+        "next_cursor": events[-1]["id"] if has_more and events else None,
+    }
+    if include_total:
+        body["total"] = total
+    return jsonify(body)
 
 
 # ------------------------------------------------------------------
@@ -135,35 +215,24 @@ def get_events():
 @api.route("/threats", methods=["GET"])
 def get_threats():
     """Threat history from the response engine log."""
+    ctx = _ctx
     severity = request.args.get("severity")
     since = request.args.get("since")
     limit = request.args.get("limit", 50, type=int)
 
     threats = []
-    if _response_engine:
-        for r in reversed(_response_engine.response_log):
-            if r.escalation_level == 0:
-                continue
-            entry = {
-                "timestamp": r.timestamp,
-                "process_id": r.threat_score.process_id,
-                "process_name": r.threat_score.process_name,
-                "score": r.threat_score.score,
-                "level": r.threat_score.level,
-                "escalation_level": r.escalation_level,
-                "actions_taken": r.actions_taken,
-                "triggered_indicators": r.threat_score.triggered_indicators,
-            }
-            if r.incident_report:
-                entry["incident_report"] = r.incident_report.to_dict()
-
-            if severity and str(r.escalation_level) != severity:
-                continue
-            if since and r.timestamp < since:
-                continue
-            threats.append(entry)
-            if len(threats) >= limit:
-                break
+    if ctx.response_engine:
+        level = None
+        if severity:
+            try:
+                level = int(severity)
+            except ValueError:
+                return jsonify({"threats": [], "total": 0})
+
+        threats = [
+            r.to_dict()
+            for r in ctx.response_engine.recent_threats(level, since=since, limit=limit)
+        ]
 
     return jsonify({"threats": threats, "total": len(threats)})
 
@@ -175,6 +244,7 @@ def get_threats():
 @api.route("/quarantine", methods=["POST"])
 def quarantine_process():
     """Manually quarantine (suspend) a process by PID."""
+    ctx = _ctx
     data = request.get_json(silent=True) or {}
     pid = data.get("pid")
     if pid is None:
@@ -185,17 +255,17 @@ def quarantine_process():
     except (TypeError, ValueError):
         return jsonify({"error": "pid must be an integer"}), 400
 
-    if not _response_engine:
+    if not ctx.response_engine:
         return jsonify({"error": "Response engine not available"}), 503
 
-    action = _response_engine.process_ctrl.suspend(pid)
+    action = ctx.response_engine.process_ctrl.suspend(pid)
 
-    if _ws_handler:
-        _ws_handler.broadcast("quarantine", {
+    if ctx.ws_handler:
+        ctx.ws_handler.broadcast("quarantine", {
             "pid": pid,
             "success": action.success,
             "error": action.error,
-        })
+        }, critical=True)
 
     return jsonify({
         "pid": pid,
@@ -211,27 +281,50 @@ def quarantine_process():
 
 @api.route("/backups", methods=["GET"])
 def get_backups():
-    """List available backups with optional filters."""
+    """List available backups with optional filters.
+
+    ``total`` is only counted when ``include_total=1`` is given.
+    """
+    ctx = _ctx
     original_path = request.args.get("path")
     process_name = request.args.get("process")
     since = request.args.get("since")
-    limit = request.args.get("limit", 50, type=int)
+    limit = max(0, request.args.get("limit", 50, type=int))
+    include_total = request.args.get("include_total") == "1"
 
-    if not _backup_manager:
-        return jsonify({"backups": [], "total": 0})
+    if not ctx.backup_manager:
+        empty = {"backups": [], "has_more": False}
+        if include_total:
+            empty["total"] = 0
+        return jsonify(empty)
 
+    snapshot = ctx.backup_manager.snapshot
     try:
-        backups = _backup_manager.snapshot.get_backups(
+        backups = snapshot.get_backups(
             original_path=original_path,
             process_name=process_name,
             since=since,
-            limit=limit,
+            limit=limit + 1,
         )
+        total = None
+        if include_total:
+            total = snapshot.count_backups(
+                original_path=original_path,
+                process_name=process_name,
+                since=since,
+            )
     except Exception as exc:
         logger.exception("Database error fetching backups")
         return jsonify({"error": f"Database error: {exc}"}), 500
 
-    return jsonify({"backups": backups, "total": len(backups)})
+    has_more = len(backups) > limit
+    if has_more:
+        del backups[limit:]
+
+    body = {"backups": backups, "has_more": has_more}
+    if include_total:
+        body["total"] = total
+    return jsonify(body)
 
 
 # ------------------------------------------------------------------
@@ -247,9 +340,10 @@ def restore_files():
         {"backup_ids": [int, ...]}   - batch restore
         {"process_name": str}        - restore all for a process
     """
+    ctx = _ctx
     data = request.get_json(silent=True) or {}
 
-    if not _backup_manager:
+    if not ctx.backup_manager:
         return jsonify({"error": "Backup manager not available"}), 503
 
     results = []
@@ -260,22 +354,25 @@ def restore_files():
                 bid = int(data["backup_id"])
             except (TypeError, ValueError):
                 return jsonify({"error": "backup_id must be an integer"}), 400
-            r = _backup_manager.recovery.restore_file(bid)
+            r = ctx.backup_manager.recovery.restore_file(bid)
             results = [_restore_to_dict(r)]
 
         elif "backup_ids" in data:
             if not isinstance(data["backup_ids"], list):
                 return jsonify({"error": "backup_ids must be a list"}), 400
+            bids = []
             for bid in data["backup_ids"]:
                 try:
-                    bid = int(bid)
+                    bids.append(int(bid))
                 except (TypeError, ValueError):
                     return jsonify({"error": f"Invalid backup_id: {bid}"}), 400
-                r = _backup_manager.recovery.restore_file(bid)
-                results.append(_restore_to_dict(r))
+            rs = ctx.backup_manager.recovery.restore_files(
+                bids, on_result=_restore_progress(ctx, len(bids)),
+            )
+            results = [_restore_to_dict(r) for r in rs]
 
         elif "process_name" in data:
-            rs = _backup_manager.recovery.restore_by_process(data["process_name"])
+            rs = ctx.backup_manager.recovery.restore_by_process(data["process_name"])
             results = [_restore_to_dict(r) for r in rs]
 
         else:
@@ -285,8 +382,8 @@ def restore_files():
         logger.exception("Error during file restore")
         return jsonify({"error": f"Restore failed: {exc}"}), 500
 
-    if _ws_handler:
-        _ws_handler.broadcast("restore", {"results": results})
+    if ctx.ws_handler:
+        ctx.ws_handler.broadcast("restore", {"results": results}, critical=True)
 
     succeeded = sum(1 for r in results if r["success"])
     return jsonify({
@@ -296,6 +393,27 @@ def restore_files():
     })
 
 
+def _restore_progress(ctx, total: int):
+    """Return a callback that broadcasts each finished restore, or None."""
+    if not ctx.ws_handler:
+        return None
+    lock = threading.Lock()
+    done = 0
+
+    def report(r):
+        nonlocal done
+        with lock:
+            done += 1
+            completed = done
+        ctx.ws_handler.broadcast("restore_progress", {
+            "completed": completed,
+            "total": total,
+            "result": _restore_to_dict(r),
+        })
+
+    return report
+
+
 def _restore_to_dict(r) -> dict:
     return {
         "original_path": r.original_path,
@@ -313,7 +431,7 @@ def _restore_to_dict(r) -> dict:
 @api.route("/config", methods=["GET"])
 def get_config():
     """Return current configuration."""
-    return jsonify(_config or {})
+    return _config_response(_ctx)
 
 
 # ------------------------------------------------------------------
@@ -323,35 +441,116 @@ def get_config():
 @api.route("/config", methods=["PUT"])
 def update_config():
     """Update configuration. Merges provided keys into existing config."""
+    ctx = _ctx
     data = request.get_json(silent=True) or {}
     if not data:
         return jsonify({"error": "No data provided"}), 400
 
-    if _config is None:
+    if ctx.config is None:
         return jsonify({"error": "Configuration not loaded"}), 503
 
-    _deep_merge(_config, data)
+    with _config_lock:
+        changed = _deep_merge(ctx.config, data)
+        if changed:
+            ctx.config_body = None
 
-    # Persist to disk
-    if _config_path:
-        try:
-            Path(_config_path).write_text(json.dumps(_config, indent=4))
-        except OSError as exc:
-            return jsonify({"error": f"Failed to save: {exc}"}), 500
+            # Persist to disk
+            if ctx.config_path:
+                try:
+                    _write_config(ctx.config_path, ctx.config)
+                except OSError as exc:
+                    return jsonify({"error": f"Failed to save: {exc}"}), 500
 
-    if _ws_handler:
-        _ws_handler.broadcast("config_updated", _config)
+    if changed and ctx.ws_handler:
+        # Only the changed settings; clients fetch the full config if needed
+        ctx.ws_handler.broadcast("config_updated", {
+            "changed": list(changed),
+            "values": changed,
+        }, critical=True)
 
-    return jsonify(_config)
+    return _config_response(ctx)
 
 
-def _deep_merge(base: dict, override: dict):
-    """Recursively merge override into base in-place."""
-    for key, value in override.items():
-        if key in base and isinstance(base[key], dict) and isinstance(value, dict):
-            _deep_merge(base[key], value)
-        else:
-            base[key] = value
+def _config_response(ctx) -> Response:
+    """JSON response for the current config, serialized once per change.
+
+    Takes ``_config_lock``, so callers must not hold it.
+    """
+    with _config_lock:
+        if ctx.config_body is None:
+            body = current_app.json.dumps(ctx.config or {}) + "\n"
+            ctx.config_body = (body, _etag(body))
+        body, etag = ctx.config_body
+    return _cached_json(body, etag)
+
+
+def _etag(body: str) -> str:
+    return hashlib.blake2b(body.encode(), digest_size=8).hexdigest()
+
+
+def _cached_json(body: str, etag: str) -> Response:
+    """JSON response for a cached body, or 304 if the client already has it."""
+    if request.method == "GET" and request.if_none_match.contains(etag):
+        resp = Response(status=304)
+    else:
+        resp = Response(body, mimetype="application/json")
+    resp.set_etag(etag)
+    return resp
+
+
+def _write_config(path: str, config: dict):
+    """Atomically replace the config file with the serialized config.
+
+    The JSON goes to a temp file in the same directory, is fsynced, and is
+    then renamed over the original, so a crash never leaves a partial file.
+    The original file's permissions are kept, and the directory is fsynced
+    so the rename itself survives a crash.
+    """
+    target = Path(path)
+    fd, tmp = tempfile.mkstemp(
+        dir=target.parent, prefix=f".{target.name}.", suffix=".tmp"
+    )
+    try:
+        try:
+            os.fchmod(fd, stat.S_IMODE(os.stat(target).st_mode))
+        except FileNotFoundError:
+            pass
+        with os.fdopen(fd, "w") as f:
+            json.dump(config, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, target)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    dir_fd = os.open(target.parent, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def _deep_merge(base: dict, override: dict) -> dict:
+    """Merge override into base in-place.
+
+    Returns the values that changed, keyed by dotted path
+    (e.g. ``{"response.safe_mode": True}``); empty if nothing changed.
+    """
+    changed = {}
+    stack = [(base, override, "")]
+    while stack:
+        b, o, prefix = stack.pop()
+        for key, value in o.items():
+            current = b.get(key, _MISSING)
+            if isinstance(current, dict) and isinstance(value, dict):
+                stack.append((current, value, f"{prefix}{key}."))
+            elif type(current) is not type(value) or current != value:
+                b[key] = value
+                changed[f"{prefix}{key}"] = value
+    return changed
 
 
 # ------------------------------------------------------------------
@@ -365,13 +564,38 @@ _demo_status = {"running": False, "phase": "idle", "progress": 0}
 DEMO_DIR = "/tmp/ransomware_demo"
 DEMO_PID = 99999
 DEMO_PROCESS = "demo_app.exe"
+DEMO_EVENT_BATCH = 8  # attack-phase events per broadcast / DB transaction
+
+# File contents reused by every demo run
+_NORMAL_BLOB = ("The quick brown fox jumps over the lazy dog.\n" * 20).encode()
+_ENCRYPTED_BLOB = os.urandom(1024)
+
+# Demo file layout, the same for every run
+_NORMAL_FILES = tuple(
+    os.path.join(DEMO_DIR, f"document_{i}.txt") for i in range(6)
+)
+_NORMAL_MESSAGES = tuple(
+    f"Normal file operation: {os.path.basename(p)}" for p in _NORMAL_FILES
+)
+_ATTACK_DIRS = tuple(
+    os.path.join(DEMO_DIR, d)
+    for d in ("docs", "photos", "projects", "backups", "reports")
+)
+# (original path, encrypted path, status message)
+_ATTACK_FILES = tuple(
+    (os.path.join(d, f"file_{j}.txt"), os.path.join(d, f"file_{j}.locked"),
+     f"Encrypting files in {os.path.basename(d)}/")
+    for d in _ATTACK_DIRS
+    for j in range(5)
+)
 
 
 def _broadcast_demo_status(phase, progress, description):
+    ctx = _ctx
     _demo_status["phase"] = phase
     _demo_status["progress"] = progress
-    if _ws_handler:
-        _ws_handler.broadcast("demo_status", {
+    if ctx.ws_handler:
+        ctx.ws_handler.broadcast("demo_status", {
             "phase": phase,
             "progress": progress,
             "description": description,
@@ -393,28 +617,32 @@ def _make_demo_event(event_type, file_path, entropy_delta=0.0, old_path=None):
 
 
 def _write_demo_file(path, content=None):
-    """Write a real file so entropy analysis can work on it."""
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    if content is None:
-        content = "The quick brown fox jumps over the lazy dog.\n" * 20
-    with open(path, "w") as f:
-        f.write(content)
+    """Write a real file so entropy analysis can work on it.
+
+    The parent directory must already exist.
+    """
+    data = _NORMAL_BLOB if content is None else content.encode()
+    with open(path, "wb") as f:
+        f.write(data)
 
 
 def _write_encrypted_file(path):
-    """Write pseudo-encrypted content (high entropy random bytes)."""
-    os.makedirs(os.path.dirname(path), exist_ok=True)
+    """Write pseudo-encrypted content (high entropy random bytes).
+
+    The parent directory must already exist.
+    """
     with open(path, "wb") as f:
-        f.write(os.urandom(1024))
+        f.write(_ENCRYPTED_BLOB)
 
 
 def _emit_event(ev):
     """Broadcast event via WebSocket and log to database."""
-    if _ws_handler:
-        _ws_handler.broadcast("file_event", ev)
-    if _event_logger:
+    ctx = _ctx
+    if ctx.ws_handler:
+        ctx.ws_handler.broadcast("file_event", ev)
+    if ctx.event_logger:
         try:
-            _event_logger.log_event(
+            ctx.event_logger.log_event(
                 event_type=ev["event_type"],
                 file_path=ev["file_path"],
                 process_id=ev.get("process_id"),
@@ -424,12 +652,27 @@ def _emit_event(ev):
             logger.debug("Demo: could not log event to database")
 
 
+def _emit_events(evs):
+    """Broadcast a batch of events as one message and log them together."""
+    if not evs:
+        return
+    ctx = _ctx
+    if ctx.ws_handler:
+        ctx.ws_handler.broadcast("file_events", evs)
+    if ctx.event_logger:
+        try:
+            ctx.event_logger.log_events(evs)
+        except Exception:
+            logger.debug("Demo: could not log events to database")
+
+
 def _feed_analyzer(ev):
     """Feed event through the behavior analyzer pipeline."""
-    if not _behavior_analyzer:
+    ctx = _ctx
+    if not ctx.behavior_analyzer:
         return
     try:
-        _behavior_analyzer.process_event(ev)
+        ctx.behavior_analyzer.process_event(ev)
     except Exception:
         logger.debug("Demo: behavior analyzer could not process event")
 
@@ -439,6 +682,7 @@ def _run_demo_simulation(stop_event, speed):
     global _demo_status
 
     delay = lambda s: time.sleep(s / speed)
+    rng = random.Random()
 
     # Setup: create demo directory
     if os.path.exists(DEMO_DIR):
@@ -451,20 +695,17 @@ def _run_demo_simulation(stop_event, speed):
         # -------------------------------------------------------
         _broadcast_demo_status("normal_activity", 0,
                                "Simulating normal file operations")
-        normal_files = [
-            os.path.join(DEMO_DIR, f"document_{i}.txt") for i in range(6)
-        ]
+        normal_files = list(_NORMAL_FILES)
         for i, fpath in enumerate(normal_files):
             if stop_event.is_set():
                 return
             _write_demo_file(fpath)
             etype = "created" if i < 3 else "modified"
             ev = _make_demo_event(etype, fpath,
-                                  entropy_delta=round(random.uniform(0.1, 0.5), 2))
+                                  entropy_delta=rng.uniform(0.1, 0.5))
             _emit_event(ev)
             pct = int((i + 1) / 6 * 20)
-            _broadcast_demo_status("normal_activity", pct,
-                                   f"Normal file operation: {os.path.basename(fpath)}")
+            _broadcast_demo_status("normal_activity", pct, _NORMAL_MESSAGES[i])
             delay(1.3)
 
         # -------------------------------------------------------
@@ -479,7 +720,7 @@ def _run_demo_simulation(stop_event, speed):
             fpath = normal_files[idx]
             _write_demo_file(fpath, "Modified content v" + str(i) + "\n" * 50)
 
-            entropy_d = round(random.uniform(0.3, 1.0), 2)
+            entropy_d = rng.uniform(0.3, 1.0)
             etype = "modified"
             old_path = None
 
@@ -491,7 +732,7 @@ def _run_demo_simulation(stop_event, speed):
                 fpath = new_path
                 normal_files[idx] = new_path
                 etype = "modified"
-                entropy_d = round(random.uniform(1.5, 2.5), 2)
+                entropy_d = rng.uniform(1.5, 2.5)
 
             ev = _make_demo_event(etype, fpath, entropy_delta=entropy_d,
                                   old_path=old_path)
@@ -509,51 +750,43 @@ def _run_demo_simulation(stop_event, speed):
         _broadcast_demo_status("ransomware_attack", 45,
                                "Ransomware-like encryption pattern detected")
 
-        attack_dirs = [
-            os.path.join(DEMO_DIR, d)
-            for d in ["docs", "photos", "projects", "backups", "reports"]
-        ]
-        for d in attack_dirs:
+        for d in _ATTACK_DIRS:
             os.makedirs(d, exist_ok=True)
 
-        attack_files = []
-        for d in attack_dirs:
-            for j in range(5):
-                attack_files.append(os.path.join(d, f"file_{j}.txt"))
-
-        for i, fpath in enumerate(attack_files):
+        batch = []
+        for i, (fpath, locked_path, message) in enumerate(_ATTACK_FILES):
             if stop_event.is_set():
+                _emit_events(batch)
                 return
-            # Write original then overwrite with "encrypted" content
-            _write_demo_file(fpath)
-            _write_encrypted_file(fpath)
+            # The plaintext is never observed, so write the "encrypted"
+            # content straight to its .locked name; the event still reports
+            # the rename
+            _write_encrypted_file(locked_path)
 
-            entropy_d = round(random.uniform(3.5, 4.2), 2)
-
-            # Rename to .locked extension
-            locked_path = fpath.replace(".txt", ".locked")
-            try:
-                os.rename(fpath, locked_path)
-            except OSError:
-                locked_path = fpath
+            entropy_d = rng.uniform(3.5, 4.2)
 
             ev = _make_demo_event("modified", locked_path,
                                   entropy_delta=entropy_d,
                                   old_path=fpath)
-            _emit_event(ev)
+            batch.append(ev)
             _feed_analyzer(ev)
 
             # Also emit some deletion events
             if i % 5 == 0:
                 del_ev = _make_demo_event("deleted", fpath, entropy_delta=0.0)
-                _emit_event(del_ev)
+                batch.append(del_ev)
                 _feed_analyzer(del_ev)
 
-            pct = 45 + int((i + 1) / len(attack_files) * 40)
-            _broadcast_demo_status("ransomware_attack", pct,
-                                   f"Encrypting files in {os.path.basename(os.path.dirname(locked_path))}/")
+            if len(batch) >= DEMO_EVENT_BATCH:
+                _emit_events(batch)
+                batch = []
+
+            pct = 45 + int((i + 1) / len(_ATTACK_FILES) * 40)
+            _broadcast_demo_status("ransomware_attack", pct, message)
             delay(0.4)
 
+        _emit_events(batch)
+
         # -------------------------------------------------------
         # Phase 4: Recovery (~6s)
         # -------------------------------------------------------
@@ -626,6 +859,7 @@ def demo_start():
 @api.route("/demo/stop", methods=["POST"])
 def demo_stop():
     """Stop a running demo simulation."""
+    ctx = _ctx
     if not _demo_status.get("running"):
         return jsonify({"error": "No demo is running"}), 409
 
@@ -633,8 +867,8 @@ def demo_stop():
     _demo_status["running"] = False
     _demo_status["phase"] = "stopped"
 
-    if _ws_handler:
-        _ws_handler.broadcast("demo_status", {
+    if ctx.ws_handler:
+        ctx.ws_handler.broadcast("demo_status", {
             "phase": "stopped",
             "progress": _demo_status["progress"],
             "description": "Demo stopped by user",
@@ -21,7 +21,13 @@ from pathlib import Path
 from flask import Flask, render_template
 from flask_sock import Sock
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib parser is used instead
+    orjson = None
+
 from src.dashboard.api.routes import api, init_routes
+from src.dashboard.json_provider import install_json_provider
 from src.dashboard.websocket_handler import WebSocketHandler
 from src.database.event_logger import EventLogger
 from src.response.backup_manager import BackupManager
@@ -32,6 +38,17 @@ logger = logging.getLogger(__name__)
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 DEFAULT_CONFIG_PATH = str(PROJECT_ROOT / "config" / "config.json")
+WS_PING_INTERVAL = 25  # seconds between server pings on /ws/live
+
+
+def _load_config(path: str) -> dict:
+    """Read the JSON config file, or return {} if it doesn't exist."""
+    if not os.path.isfile(path):
+        return {}
+    raw = Path(path).read_bytes()
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
 
 
 def create_app(
@@ -47,10 +64,7 @@ def create_app(
     defaults from config.
     """
     cfg_path = config_path or DEFAULT_CONFIG_PATH
-    config = {}
-    if os.path.isfile(cfg_path):
-        with open(cfg_path) as f:
-            config = json.load(f)
+    config = _load_config(cfg_path)
 
     # Defaults for services not provided
     if event_logger is None:
@@ -73,7 +87,7 @@ def create_app(
             on_threat=lambda ts: response_engine.respond(ts),
         )
 
-    ws_handler = WebSocketHandler()
+    ws_handler = WebSocketHandler(queued=True)
 
     # Build Flask app
     dashboard_dir = Path(__file__).resolve().parent
@@ -82,6 +96,9 @@ def create_app(
         template_folder=str(dashboard_dir / "templates"),
         static_folder=str(dashboard_dir / "static"),
     )
+    install_json_provider(app)
+    # Protocol-level pings keep idle clients connected and drop dead ones
+    app.config["SOCK_SERVER_OPTIONS"] = {"ping_interval": WS_PING_INTERVAL}
     sock = Sock(app)
 
     # Wire routes
@@ -101,11 +118,9 @@ def create_app(
     def ws_live(ws):
         ws_handler.register(ws)
         try:
-            while True:
-                # Keep connection alive; client can send pings
-                data = ws.receive(timeout=60)
-                if data is None:
-                    break
+            # Block until the client goes away; nothing it sends is used
+            while ws.receive() is not None:
+                pass
         except Exception:
             pass
         finally:
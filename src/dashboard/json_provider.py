@@ -0,0 +1,31 @@
+"""orjson-backed JSON provider for the dashboard API.
+
+Used for every ``jsonify`` response and ``request.get_json`` call when
+orjson is installed. Without it, Flask's stdlib provider stays in place.
+"""
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; Flask's default provider is used instead
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Serialize with orjson, keeping Flask's sorted, compact output."""
+
+    def dumps(self, obj, **kwargs) -> str:
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+def install_json_provider(app):
+    """Swap in the orjson provider on ``app`` if orjson is available."""
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
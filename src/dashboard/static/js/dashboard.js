@@ -174,7 +174,8 @@ async function refreshEvents() {
     const typeFilter = document.getElementById("event-type-filter").value;
     const params = typeFilter ? "?type=" + typeFilter + "&limit=100" : "?limit=100";
     const data = await apiGet("/events" + params);
-    document.getElementById("event-count").textContent = data.total;
+    document.getElementById("event-count").textContent =
+        data.events.length + (data.has_more ? "+" : "");
 
     const feed = document.getElementById("event-feed");
     if (data.events.length === 0) {
@@ -319,7 +320,8 @@ async function refreshBackups() {
     if (process) params += "&process=" + encodeURIComponent(process);
 
     const data = await apiGet("/backups" + params);
-    document.getElementById("backup-total").textContent = data.total;
+    document.getElementById("backup-total").textContent =
+        data.backups.length + (data.has_more ? "+" : "");
     state.selectedBackups.clear();
     updateBatchButton();
 
@@ -642,9 +644,9 @@ function initCharts() {
 async function refreshStats() {
     // Fetch data
     const [evData, thrData, bkData] = await Promise.all([
-        apiGet("/events?limit=1000"),
+        apiGet("/events?limit=1000&include_total=1"),
         apiGet("/threats?limit=1000"),
-        apiGet("/backups?limit=1000"),
+        apiGet("/backups?limit=1000&include_total=1"),
     ]);
 
     // Summary cards
@@ -804,6 +806,11 @@ function connectWebSocket() {
                     prependEvent(msg.data);
                 }
                 break;
+            case "file_events":
+                if (!state.feedPaused) {
+                    msg.data.forEach(prependEvent);
+                }
+                break;
             case "threat":
                 showToast("Threat detected: " + (msg.data.process_name || "unknown") +
                     " (score " + (msg.data.score || "?") + ")", "danger");
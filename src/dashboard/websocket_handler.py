@@ -6,21 +6,112 @@ alerts, status changes) to all listeners on /ws/live.
 
 import json
 import logging
+import queue
 import threading
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib encoder is used instead
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+DEFAULT_QUEUE_SIZE = 256  # outbound messages buffered per client
+# Above this many bytes queued across all clients, non-critical broadcasts
+# are skipped
+WS_BROADCAST_FLOOR = 8 * 1024 * 1024
+
+
+def _encode(message: dict) -> str:
+    """Serialize a broadcast message once for all clients.
+
+    The result stays a str: simple-websocket sends bytes as a binary frame,
+    which the dashboard's ``JSON.parse(evt.data)`` can't read.
+    """
+    if orjson is not None:
+        return orjson.dumps(message, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(message, separators=(",", ":"))
+
+
+class _ClientWriter:
+    """Outbound queue for one client, drained by its own thread."""
+
+    def __init__(self, handler: "WebSocketHandler", ws, queue_size: int):
+        self.ws = ws
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.closed = False
+        self.queued_bytes = 0
+        self._bytes_lock = threading.Lock()
+        self._handler = handler
+        self._thread = threading.Thread(target=self._run, name="ws-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            message = self.queue.get()
+            if message is None or self.closed:
+                return
+            try:
+                self.ws.send(message)
+            except Exception:
+                self._handler.unregister(self.ws)
+                return
+            finally:
+                with self._bytes_lock:
+                    self.queued_bytes -= len(message)
+
+    def put(self, message: str) -> bool:
+        """Queue a message; returns False if the queue is full."""
+        with self._bytes_lock:
+            try:
+                self.queue.put_nowait(message)
+            except queue.Full:
+                return False
+            self.queued_bytes += len(message)
+        return True
+
+    def close(self):
+        self.closed = True
+        try:
+            self.queue.put_nowait(None)
+        except queue.Full:
+            pass  # the writer is busy and will see ``closed`` on its next get
+
 
 class WebSocketHandler:
-    """Thread-safe registry of WebSocket clients with broadcast."""
+    """Thread-safe registry of WebSocket clients with broadcast.
 
-    def __init__(self):
+    Parameters
+    ----------
+    queued:
+        When True, each client gets a bounded outbound queue drained by a
+        dedicated writer thread. ``broadcast`` then only enqueues, so one
+        slow client can't hold up the caller or the other clients; when a
+        client's queue is full, new messages for it are dropped. When False
+        (the default) messages are sent inline under the registry lock.
+    queue_size:
+        Per-client queue capacity in queued mode.
+    broadcast_floor:
+        In queued mode, once more than this many bytes are waiting across
+        all clients, non-critical broadcasts are skipped (and counted in
+        ``broadcasts_skipped``) until the writers catch up.
+    """
+
+    def __init__(self, queued: bool = False, queue_size: int = DEFAULT_QUEUE_SIZE,
+                 broadcast_floor: int = WS_BROADCAST_FLOOR):
         self._clients: list = []
         self._lock = threading.Lock()
+        self.queued = queued
+        self.queue_size = queue_size
+        self.broadcast_floor = broadcast_floor
+        self.broadcasts_skipped = 0
+        self._writers: dict[int, _ClientWriter] = {}
 
     def register(self, ws):
         with self._lock:
             self._clients.append(ws)
+            if self.queued:
+                self._writers[id(ws)] = _ClientWriter(self, ws, self.queue_size)
         logger.debug("WebSocket client connected (%d total)", len(self._clients))
 
     def unregister(self, ws):
@@ -29,11 +120,33 @@ class WebSocketHandler:
                 self._clients.remove(ws)
             except ValueError:
                 pass
+            writer = self._writers.pop(id(ws), None)
+        if writer is not None:
+            writer.close()
         logger.debug("WebSocket client disconnected (%d remaining)", len(self._clients))
 
-    def broadcast(self, event_type: str, data: dict):
-        """Send a JSON message to all connected clients."""
-        message = json.dumps({"type": event_type, "data": data})
+    def broadcast(self, event_type: str, data: dict, critical: bool = False):
+        """Send a JSON message to all connected clients.
+
+        In queued mode a non-critical message is skipped while the total
+        backlog is above ``broadcast_floor``.
+        """
+        if self.queued:
+            with self._lock:
+                writers = list(self._writers.values())
+            if not critical and self.queued_bytes(writers) > self.broadcast_floor:
+                with self._lock:
+                    self.broadcasts_skipped += 1
+                return
+            message = _encode({"type": event_type, "data": data})
+            for writer in writers:
+                if not writer.put(message):
+                    logger.debug("Dropping %s message for slow WebSocket client",
+                                 event_type)
+            return
+
+        message = _encode({"type": event_type, "data": data})
+
         dead = []
         with self._lock:
             for ws in self._clients:
@@ -41,11 +154,16 @@ class WebSocketHandler:
                     ws.send(message)
                 except Exception:
                     dead.append(ws)
-            for ws in dead:
-                try:
-                    self._clients.remove(ws)
-                except ValueError:
-                    pass
+            if dead:
+                dead_ids = {id(ws) for ws in dead}
+                self._clients = [ws for ws in self._clients if id(ws) not in dead_ids]
+
+    def queued_bytes(self, writers: list[_ClientWriter] | None = None) -> int:
+        """Bytes waiting in client queues (always 0 when not queued)."""
+        if writers is None:
+            with self._lock:
+                writers = list(self._writers.values())
+        return sum(w.queued_bytes for w in writers)
 
     @property
     def client_count(self) -> int:
@@ -2,15 +2,46 @@
 
 import sqlite3
 import threading
+import time
 import logging
 from datetime import datetime
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Buffered events are committed once this many are pending, or after
+# FLUSH_INTERVAL seconds, whichever comes first
+FLUSH_BATCH_SIZE = 500
+FLUSH_INTERVAL = 0.5
+# Past this many pending events, callers flush inline instead of buffering
+MAX_PENDING = 10_000
+
+_INSERT_EVENT = """
+    INSERT INTO file_events (
+        timestamp, event_type, file_path, file_extension,
+        old_path, file_size_before, file_size_after,
+        process_id, process_name, is_directory
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _stamped(row: tuple) -> tuple:
+    """Row with its epoch timestamp, if it has one, formatted as ISO 8601."""
+    ts = row[0]
+    if isinstance(ts, float):
+        return (datetime.fromtimestamp(ts).isoformat(),) + row[1:]
+    return row
+
 
 class EventLogger:
-    """Thread-safe SQLite logger for file system events."""
+    """Thread-safe SQLite logger for file system events.
+
+    Events are buffered in memory and inserted in batches by a background
+    writer thread, one transaction per batch. That thread makes every
+    insert, so SQLite only ever sees one writer; other threads' connections
+    only read. Queries flush the buffer first, so they always see every
+    event logged before them.
+    """
 
     def __init__(self, db_path: str):
         self.db_path = Path(db_path)
@@ -18,6 +49,25 @@ class EventLogger:
         self._local = threading.local()
         self._init_db()
 
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: list[tuple] = []
+        # Rows ever queued and ever committed; a flush waits for the writer
+        # to commit up to the queued count it saw. Failed batches bump
+        # _failures so waiters can raise the writer's error.
+        self._queued = 0
+        self._committed = 0
+        self._failures = 0
+        self._last_error: BaseException | None = None
+        self._committed_cond = threading.Condition()
+
+        self._flush_requested = threading.Event()
+        self._closed = threading.Event()
+        self._writer = threading.Thread(
+            target=self._writer_loop, name="event-logger-writer", daemon=True,
+        )
+        self._writer.start()
+
     def _get_connection(self) -> sqlite3.Connection:
         if not hasattr(self._local, "connection") or self._local.connection is None:
             self._local.connection = sqlite3.connect(
@@ -26,6 +76,11 @@ class EventLogger:
             self._local.connection.row_factory = sqlite3.Row
             self._local.connection.execute("PRAGMA journal_mode=WAL")
             self._local.connection.execute("PRAGMA synchronous=NORMAL")
+            # 64 MiB page cache, in-memory temp tables and memory-mapped
+            # reads for the event table's scans and sorts
+            self._local.connection.execute("PRAGMA cache_size=-64000")
+            self._local.connection.execute("PRAGMA temp_store=MEMORY")
+            self._local.connection.execute("PRAGMA mmap_size=268435456")
         return self._local.connection
 
     def _init_db(self):
@@ -68,61 +123,185 @@ class EventLogger:
         process_id: int = None,
         process_name: str = None,
         is_directory: bool = False,
-    ) -> int:
-        """Insert a file event record. Returns the row ID."""
-        timestamp = datetime.now().isoformat()
-        conn = self._get_connection()
-        cursor = conn.execute(
-            """
-            INSERT INTO file_events (
-                timestamp, event_type, file_path, file_extension,
-                old_path, file_size_before, file_size_after,
-                process_id, process_name, is_directory
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                timestamp,
-                event_type,
-                file_path,
-                file_extension,
-                old_path,
-                file_size_before,
-                file_size_after,
-                process_id,
-                process_name,
-                int(is_directory),
-            ),
-        )
-        conn.commit()
+    ):
+        """Queue a file event record for insertion."""
+        self._enqueue([(
+            time.time(),
+            event_type,
+            file_path,
+            file_extension,
+            old_path,
+            file_size_before,
+            file_size_after,
+            process_id,
+            process_name,
+            int(is_directory),
+        )])
         logger.debug(
             "Logged %s event for %s (pid=%s)", event_type, file_path, process_id
         )
-        return cursor.lastrowid
+
+    def log_events(self, events: list[dict]) -> int:
+        """Queue several events for insertion. Returns the count.
+
+        Each dict takes the same keys as ``log_event``'s arguments; only
+        ``event_type`` and ``file_path`` are required. An event without a
+        ``timestamp`` is stamped with the time of the call.
+        """
+        if not events:
+            return 0
+        now = time.time()
+        rows = [
+            (
+                ev.get("timestamp") or now,
+                ev["event_type"],
+                ev["file_path"],
+                ev.get("file_extension"),
+                ev.get("old_path"),
+                ev.get("file_size_before"),
+                ev.get("file_size_after"),
+                ev.get("process_id"),
+                ev.get("process_name"),
+                int(ev.get("is_directory", False)),
+            )
+            for ev in events
+        ]
+        self._enqueue(rows)
+        logger.debug("Logged %d events", len(rows))
+        return len(rows)
+
+    # ------------------------------------------------------------------
+    # Buffered writes
+    # ------------------------------------------------------------------
+
+    def _enqueue(self, rows: list[tuple]):
+        with self._pending_lock:
+            self._pending.extend(rows)
+            self._queued += len(rows)
+            pending = len(self._pending)
+        if pending >= MAX_PENDING:
+            # The writer is falling behind; make the producer wait on it
+            self.flush()
+        elif pending >= FLUSH_BATCH_SIZE:
+            self._flush_requested.set()
+
+    def _writer_loop(self):
+        while not self._closed.is_set():
+            self._flush_requested.wait(FLUSH_INTERVAL)
+            self._flush_requested.clear()
+            try:
+                self._write_pending()
+            except sqlite3.Error:
+                logger.exception("Failed to flush file events")
+        self._close_connection()
+
+    def flush(self):
+        """Wait until every event queued so far has been committed.
+
+        The writer thread does the insert; once it has stopped, the calling
+        thread does it instead.
+        """
+        if threading.current_thread() is self._writer:
+            self._write_pending()
+            return
+        with self._pending_lock:
+            target = self._queued
+        with self._committed_cond:
+            failures = self._failures
+            while self._committed < target and self._writer.is_alive():
+                if self._failures != failures:
+                    raise self._last_error
+                self._flush_requested.set()
+                self._committed_cond.wait(FLUSH_INTERVAL)
+            if self._committed >= target:
+                return
+        # The writer has stopped; insert what's left here
+        self._write_pending()
+
+    def _write_pending(self):
+        """Insert all buffered events in one transaction."""
+        with self._flush_lock:
+            with self._pending_lock:
+                rows = self._pending
+                self._pending = []
+            if not rows:
+                return
+            conn = None
+            try:
+                conn = self._get_connection()
+                conn.executemany(_INSERT_EVENT, map(_stamped, rows))
+                conn.commit()
+            except BaseException as exc:
+                # Undo the partial batch and put it back ahead of anything
+                # queued since, so the next flush retries it
+                if conn is not None:
+                    conn.rollback()
+                with self._pending_lock:
+                    self._pending = rows + self._pending
+                with self._committed_cond:
+                    self._failures += 1
+                    self._last_error = exc
+                    self._committed_cond.notify_all()
+                raise
+            with self._committed_cond:
+                self._committed += len(rows)
+                self._committed_cond.notify_all()
+
+    @staticmethod
+    def _where(since: str = None, event_type: str = None) -> tuple[str, list]:
+        clauses = []
+        params = []
+        if since:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if event_type:
+            clauses.append("event_type = ?")
+            params.append(event_type)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        return where, params
 
     def get_events(
         self,
         since: str = None,
         event_type: str = None,
         limit: int = 100,
+        offset: int = 0,
+        before_id: int = None,
     ) -> list[dict]:
-        """Query events with optional filters."""
-        conn = self._get_connection()
-        query = "SELECT * FROM file_events WHERE 1=1"
-        params = []
+        """Query events with optional filters, newest first.
 
-        if since:
-            query += " AND timestamp >= ?"
-            params.append(since)
-        if event_type:
-            query += " AND event_type = ?"
-            params.append(event_type)
-
-        query += " ORDER BY timestamp DESC LIMIT ?"
-        params.append(limit)
+        ``before_id`` restricts the results to events older than that ID,
+        for cursor-based paging that doesn't slow down with page depth.
+        """
+        self.flush()
+        conn = self._get_connection()
+        where, params = self._where(since, event_type)
+        if before_id is not None:
+            where += (" AND" if where else " WHERE") + " id < ?"
+            params.append(before_id)
+        # Rows are appended with the current time, so id order is
+        # chronological; ordering by the rowid lets SQLite walk the table
+        # (or idx_events_type, which stores rowids in order) backwards and
+        # stop after limit+offset rows instead of sorting.
+        query = (
+            "SELECT * FROM file_events" + where
+            + " ORDER BY id DESC LIMIT ? OFFSET ?"
+        )
+        params += [limit, offset]
 
         rows = conn.execute(query, params).fetchall()
         return [dict(row) for row in rows]
 
+    def count_events(self, since: str = None, event_type: str = None) -> int:
+        """Count events matching the same filters as get_events."""
+        self.flush()
+        conn = self._get_connection()
+        where, params = self._where(since, event_type)
+        row = conn.execute(
+            "SELECT COUNT(*) FROM file_events" + where, params
+        ).fetchone()
+        return row[0]
+
     def vacuum(self):
         """Reclaim unused database space. Call periodically for maintenance."""
         try:
@@ -132,7 +311,16 @@ class EventLogger:
         except sqlite3.Error as exc:
             logger.error("Failed to vacuum database: %s", exc)
 
-    def close(self):
+    def _close_connection(self):
         if hasattr(self._local, "connection") and self._local.connection:
             self._local.connection.close()
             self._local.connection = None
+
+    def close(self):
+        """Stop the writer thread, insert outstanding events and close."""
+        self._closed.set()
+        self._flush_requested.set()
+        if self._writer.is_alive() and self._writer is not threading.current_thread():
+            self._writer.join(timeout=5)
+        self.flush()
+        self._close_connection()
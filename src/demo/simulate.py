@@ -1,7 +1,7 @@
 """Standalone CLI script to trigger a demo simulation via the dashboard API.
 
 Usage:
-    python -m src.demo.simulate                    # start demo, poll until complete
+    python -m src.demo.simulate                    # start demo, follow until complete
     python -m src.demo.simulate --speed 2.0        # run at 2x speed
     python -m src.demo.simulate --stop             # stop a running demo
     python -m src.demo.simulate --base-url http://host:port
@@ -14,9 +14,34 @@ import time
 import urllib.error
 import urllib.request
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib codec is used instead
+    orjson = None
+
+try:
+    import simple_websocket
+except ImportError:  # installed with flask-sock; without it, status is polled
+    simple_websocket = None
+
+DONE_PHASES = ("complete", "stopped")
+WS_IDLE_TIMEOUT = 10  # seconds without a message before re-checking over HTTP
+
+
+def _dumps(data) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data).encode()
+
+
+def _loads(raw):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
 
 def _post(url, data=None):
-    body = json.dumps(data or {}).encode()
+    body = _dumps(data or {})
     req = urllib.request.Request(
         url,
         data=body,
@@ -25,18 +50,80 @@ def _post(url, data=None):
     )
     try:
         with urllib.request.urlopen(req, timeout=10) as resp:
-            return json.loads(resp.read()), resp.status
+            return _loads(resp.read()), resp.status
     except urllib.error.HTTPError as exc:
-        return json.loads(exc.read()), exc.code
+        return _loads(exc.read()), exc.code
 
 
 def _get(url):
     req = urllib.request.Request(url, method="GET")
     try:
         with urllib.request.urlopen(req, timeout=10) as resp:
-            return json.loads(resp.read()), resp.status
+            return _loads(resp.read()), resp.status
     except urllib.error.HTTPError as exc:
-        return json.loads(exc.read()), exc.code
+        return _loads(exc.read()), exc.code
+
+
+def _connect_ws(base):
+    """Subscribe to /ws/live, or return None if that isn't possible."""
+    if simple_websocket is None:
+        return None
+    url = "ws" + base[len("http"):] + "/ws/live"
+    try:
+        return simple_websocket.Client.connect(url)
+    except Exception as exc:
+        print(f"  Live updates unavailable ({exc}); polling instead")
+        return None
+
+
+def _follow_ws(ws, base):
+    """Print demo progress pushed over the WebSocket until the demo ends.
+
+    Returns False if the connection drops, so the caller can fall back to
+    polling.
+    """
+    try:
+        while True:
+            try:
+                raw = ws.receive(timeout=WS_IDLE_TIMEOUT)
+            except simple_websocket.ConnectionClosed:
+                return False
+            if raw is None:
+                # Quiet for a while: the final update may have been missed
+                data, _ = _get(base + "/api/demo/status")
+                if not data.get("running", False):
+                    return True
+                continue
+
+            msg = _loads(raw)
+            if msg.get("type") != "demo_status":
+                continue
+            data = msg["data"]
+            phase = data.get("phase", "?")
+            print(f"  [{phase}] {data.get('progress', 0)}%")
+            if phase in DONE_PHASES:
+                return True
+    finally:
+        ws.close()
+
+
+def _poll(base):
+    """Print demo progress by polling the status endpoint until it ends."""
+    while True:
+        time.sleep(2)
+        try:
+            data, _ = _get(base + "/api/demo/status")
+        except Exception as exc:
+            print(f"  Error polling status: {exc}")
+            continue
+
+        phase = data.get("phase", "?")
+        progress = data.get("progress", 0)
+        running = data.get("running", False)
+        print(f"  [{phase}] {progress}%")
+
+        if not running or phase in DONE_PHASES:
+            break
 
 
 def main():
@@ -65,30 +152,20 @@ def main():
             print("Error:", data.get("error", "unknown"))
         return
 
-    # Start the demo
+    # Subscribe before starting so no update is missed
+    ws = _connect_ws(base)
+
     data, status = _post(base + "/api/demo/start", {"speed": args.speed})
     if status != 200:
+        if ws is not None:
+            ws.close()
         print("Failed to start demo:", data.get("error", "unknown"))
         sys.exit(1)
 
-    print(f"Demo started (speed={args.speed}x). Polling status...")
+    print(f"Demo started (speed={args.speed}x). Following status...")
 
-    # Poll until complete
-    while True:
-        time.sleep(2)
-        try:
-            data, _ = _get(base + "/api/demo/status")
-        except Exception as exc:
-            print(f"  Error polling status: {exc}")
-            continue
-
-        phase = data.get("phase", "?")
-        progress = data.get("progress", 0)
-        running = data.get("running", False)
-        print(f"  [{phase}] {progress}%")
-
-        if not running or phase in ("complete", "stopped"):
-            break
+    if ws is None or not _follow_ws(ws, base):
+        _poll(base)
 
     print("Demo finished.")
 
@@ -4,9 +4,12 @@ import argparse
 import json
 import logging
 import os
+import re
 import signal
 import sys
+import threading
 import time
+from collections import OrderedDict
 from pathlib import Path
 
 import psutil
@@ -34,38 +37,111 @@ logger = logging.getLogger(__name__)
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 DEFAULT_CONFIG = PROJECT_ROOT / "config" / "config.json"
 
+# The heuristic writer lookup scans every process, so its answer is reused
+# for this many seconds
+PROCESS_CACHE_TTL = 0.25
+DEFAULT_SIZE_CACHE_SIZE = 50_000  # last known sizes kept for size deltas
+# A burst of modified events for one path is handled at most once per
+# window: the first immediately, the rest coalesced into one at its end
+MODIFY_DEBOUNCE = 0.2
+
+# Linux exposes per-process I/O counters as plain files under /proc
+_PROC_ROOT = "/proc"
+_HAVE_PROCFS = sys.platform.startswith("linux") and os.path.isdir(_PROC_ROOT)
+
+# Event types the handler acts on; watchdog's others are dropped in dispatch
+_HANDLED_EVENTS = frozenset({"created", "modified", "deleted", "moved"})
+
+_proc_cache_lock = threading.Lock()
+_proc_cache: tuple[float, tuple[int | None, str | None]] | None = None
+
 
 def get_process_info(pid: int = None) -> tuple[int | None, str | None]:
     """Get process ID and name for the most likely writer process.
 
     Attempts to identify which process triggered the file event by checking
     recent disk-writing processes. Falls back to None if unavailable.
+    Without ``pid`` the result is cached for ``PROCESS_CACHE_TTL`` seconds.
     """
+    global _proc_cache
     try:
         if pid:
             proc = psutil.Process(pid)
             return proc.pid, proc.name()
+    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+        return None, None
+
+    with _proc_cache_lock:
+        now = time.monotonic()
+        if _proc_cache is not None and now - _proc_cache[0] < PROCESS_CACHE_TTL:
+            return _proc_cache[1]
+        result = _top_writer()
+        _proc_cache = (now, result)
+        return result
 
+
+def _top_writer() -> tuple[int | None, str | None]:
+    """Scan all processes for the one with the most bytes written."""
+    if _HAVE_PROCFS:
+        return _top_writer_procfs()
+    try:
         current_pid = os.getpid()
-        candidates = []
+        best = None
         for proc in psutil.process_iter(["pid", "name", "io_counters"]):
             try:
                 if proc.info["pid"] == current_pid:
                     continue
                 io = proc.info.get("io_counters")
-                if io and io.write_bytes > 0:
-                    candidates.append((proc.info["pid"], proc.info["name"], io.write_bytes))
+                if io and io.write_bytes > 0 and (best is None or io.write_bytes > best[2]):
+                    best = (proc.info["pid"], proc.info["name"], io.write_bytes)
             except (psutil.NoSuchProcess, psutil.AccessDenied):
                 continue
 
-        if candidates:
-            candidates.sort(key=lambda x: x[2], reverse=True)
-            return candidates[0][0], candidates[0][1]
+        if best is not None:
+            return best[0], best[1]
     except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
         pass
     return None, None
 
 
+def _top_writer_procfs() -> tuple[int | None, str | None]:
+    """Linux ``_top_writer``: read ``/proc/<pid>/io`` directly.
+
+    Same answer as the psutil scan, without building a Process object and
+    its extra /proc reads for every pid; only the winner's name is read.
+    """
+    current_pid = os.getpid()
+    best_pid, best_bytes = None, 0
+    try:
+        entries = os.listdir(_PROC_ROOT)
+    except OSError:
+        return None, None
+    for entry in entries:
+        if not entry.isdigit() or int(entry) == current_pid:
+            continue
+        try:
+            with open(f"{_PROC_ROOT}/{entry}/io", "rb") as f:
+                io = f.read()
+        except OSError:  # exited, or not ours to read
+            continue
+        start = io.find(b"\nwrite_bytes:")
+        if start < 0:
+            continue
+        end = io.find(b"\n", start + 1)
+        written = int(io[start + 13:end if end >= 0 else None])
+        if written > best_bytes:
+            best_pid, best_bytes = int(entry), written
+
+    if best_pid is None:
+        return None, None
+    try:
+        with open(f"{_PROC_ROOT}/{best_pid}/comm", "rb") as f:
+            name = f.read().rstrip(b"\n").decode(errors="replace")
+    except OSError:
+        return None, None
+    return best_pid, name
+
+
 def get_file_size(path: str) -> int | None:
     """Return file size in bytes, or None if inaccessible."""
     try:
@@ -80,54 +156,96 @@ class RansomwareEventHandler(FileSystemEventHandler):
     def __init__(self, event_logger: EventLogger, exclude_dirs: list[str] = None,
                  extension_filter: list[str] = None,
                  entropy_detector: EntropyDetector = None,
-                 behavior_analyzer: BehaviorAnalyzer = None):
+                 behavior_analyzer: BehaviorAnalyzer = None,
+                 size_cache_size: int = DEFAULT_SIZE_CACHE_SIZE,
+                 modify_debounce: float = MODIFY_DEBOUNCE):
         super().__init__()
         self.event_logger = event_logger
         self.entropy_detector = entropy_detector
         self.behavior_analyzer = behavior_analyzer
         self.exclude_dirs = [os.path.normpath(d) for d in (exclude_dirs or [])]
-        self.extension_filter = [
+        # Any path containing one of the excluded strings is skipped; one
+        # alternation finds that in a single scan of the path
+        self._exclude_re = (
+            re.compile("|".join(map(re.escape, self.exclude_dirs)))
+            if self.exclude_dirs else None
+        )
+        self.extension_filter = frozenset(
             ext if ext.startswith(".") else f".{ext}"
             for ext in (extension_filter or [])
-        ]
-        self._size_cache: dict[str, int] = {}
+        )
+        # Last known size per path, least recently used first
+        self.size_cache_size = size_cache_size
+        self._size_cache: OrderedDict[str, int] = OrderedDict()
+
+        # Observer callbacks and coalesced modifies run on different threads;
+        # this keeps the handler's state single-threaded
+        self._handle_lock = threading.RLock()
+        # path -> end of its debounce window, oldest first, and the latest
+        # event that arrived inside the window
+        self.modify_debounce = modify_debounce
+        self._modify_windows: OrderedDict[str, float] = OrderedDict()
+        self._trailing: dict[str, FileModifiedEvent] = {}
+        self._debounce_cond = threading.Condition()
+        self._debounce_thread: threading.Thread | None = None
+        self._closed = False
+
+    def _size_put(self, path: str, size: int):
+        self._size_cache[path] = size
+        self._size_cache.move_to_end(path)
+        if len(self._size_cache) > self.size_cache_size:
+            self._size_cache.popitem(last=False)
 
     def _is_excluded(self, path: str) -> bool:
-        norm = os.path.normpath(path)
-        for exc in self.exclude_dirs:
-            if exc in norm:
-                return True
-        return False
+        if self._exclude_re is None:
+            return False
+        return self._exclude_re.search(os.path.normpath(path)) is not None
 
-    def _passes_extension_filter(self, path: str) -> bool:
+    def _passes_extension_filter(self, ext: str) -> bool:
+        """Check an extension, as split off by ``os.path.splitext``."""
         if not self.extension_filter:
             return True
-        _, ext = os.path.splitext(path)
         return ext.lower() in self.extension_filter
 
-    def _detect_extension_change(self, old_path: str, new_path: str) -> bool:
-        _, old_ext = os.path.splitext(old_path)
-        _, new_ext = os.path.splitext(new_path)
+    def _detect_extension_change(self, old_ext: str, new_ext: str) -> bool:
         return old_ext.lower() != new_ext.lower()
 
+    def dispatch(self, event):
+        """Route an event to its ``on_*`` method.
+
+        Event types with no handler (opened, closed, ...) and events on
+        excluded paths are dropped here, before any per-event work. A move
+        is dropped only if both ends are excluded.
+        """
+        if event.event_type not in _HANDLED_EVENTS:
+            return
+        if self._is_excluded(event.src_path) and (
+            event.event_type != "moved" or self._is_excluded(event.dest_path)
+        ):
+            return
+        getattr(self, f"on_{event.event_type}")(event)
+
     def on_created(self, event):
         try:
-            self._handle_created(event)
+            with self._handle_lock:
+                self._handle_created(event)
         except Exception:
             logger.exception("Error handling created event for %s", event.src_path)
 
     def _handle_created(self, event):
-        if self._is_excluded(event.src_path):
-            return
-        if not event.is_directory and not self._passes_extension_filter(event.src_path):
+        _, ext = os.path.splitext(event.src_path)
+        if not event.is_directory and not self._passes_extension_filter(ext):
             return
 
-        size = get_file_size(event.src_path)
+        # The entropy scan opens the file anyway and reports its size too
+        result = None
+        if not event.is_directory and self.entropy_detector:
+            result = self.entropy_detector.on_file_created(event.src_path)
+        size = result["file_size"] if result else get_file_size(event.src_path)
         if size is not None:
-            self._size_cache[event.src_path] = size
+            self._size_put(event.src_path, size)
 
         pid, pname = get_process_info()
-        _, ext = os.path.splitext(event.src_path)
 
         self.event_logger.log_event(
             event_type="created",
@@ -141,12 +259,10 @@ class RansomwareEventHandler(FileSystemEventHandler):
         logger.info("CREATED: %s (pid=%s, %s)", event.src_path, pid, pname)
 
         entropy_delta = None
-        if not event.is_directory and self.entropy_detector:
-            result = self.entropy_detector.on_file_created(event.src_path)
-            if result and result["suspicious"]:
-                logger.warning("ENTROPY ALERT on create: %s (%.2f)",
-                               event.src_path, result["entropy_after"])
-                entropy_delta = result.get("delta")
+        if result and result["suspicious"]:
+            logger.warning("ENTROPY ALERT on create: %s (%.2f)",
+                           event.src_path, result["entropy_after"])
+            entropy_delta = result.get("delta")
 
         if not event.is_directory and self.behavior_analyzer:
             self.behavior_analyzer.process_event(
@@ -159,26 +275,96 @@ class RansomwareEventHandler(FileSystemEventHandler):
             )
 
     def on_modified(self, event):
+        if self.modify_debounce > 0 and not event.is_directory:
+            with self._debounce_cond:
+                if not self._closed and self._debounce(event):
+                    return
+        self._run_modified(event)
+
+    def _run_modified(self, event):
         try:
-            self._handle_modified(event)
+            with self._handle_lock:
+                self._handle_modified(event)
         except Exception:
             logger.exception("Error handling modified event for %s", event.src_path)
 
+    def _debounce(self, event) -> bool:
+        """Return True if ``event`` falls in its path's window and is deferred.
+
+        Called with ``_debounce_cond`` held.
+        """
+        now = time.monotonic()
+        windows = self._modify_windows
+        while windows:
+            path, end = next(iter(windows.items()))
+            if end > now or path in self._trailing:
+                break
+            del windows[path]
+        end = windows.get(event.src_path)
+        if end is None or end <= now:
+            windows[event.src_path] = now + self.modify_debounce
+            windows.move_to_end(event.src_path)
+            return False
+        self._trailing[event.src_path] = event
+        if self._debounce_thread is None:
+            self._debounce_thread = threading.Thread(
+                target=self._debounce_loop, name="modify-debounce", daemon=True,
+            )
+            self._debounce_thread.start()
+        self._debounce_cond.notify()
+        return True
+
+    def _debounce_loop(self):
+        """Handle each deferred modify once its path's window has closed."""
+        while True:
+            with self._debounce_cond:
+                while True:
+                    now = time.monotonic()
+                    due = [p for p in self._trailing
+                           if self._closed or self._modify_windows[p] <= now]
+                    if due or self._closed:
+                        break
+                    wait = None
+                    if self._trailing:
+                        wait = min(self._modify_windows[p] for p in self._trailing) - now
+                    self._debounce_cond.wait(wait)
+                events = [self._trailing.pop(p) for p in due]
+                stop = self._closed and not self._trailing
+            for event in events:
+                self._run_modified(event)
+            if stop:
+                return
+
+    def _drop_trailing(self, path: str):
+        with self._debounce_cond:
+            self._trailing.pop(path, None)
+            self._modify_windows.pop(path, None)
+
+    def close(self):
+        """Handle any deferred modified events and stop the debounce thread."""
+        with self._debounce_cond:
+            self._closed = True
+            thread = self._debounce_thread
+            self._debounce_cond.notify()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5)
+
     def _handle_modified(self, event):
         if event.is_directory:
             return
-        if self._is_excluded(event.src_path):
-            return
-        if not self._passes_extension_filter(event.src_path):
+        _, ext = os.path.splitext(event.src_path)
+        if not self._passes_extension_filter(ext):
             return
 
+        result = None
+        if self.entropy_detector:
+            result = self.entropy_detector.analyze_file(event.src_path)
         size_before = self._size_cache.get(event.src_path)
-        size_after = get_file_size(event.src_path)
+        size_after = result["file_size"] if result else get_file_size(event.src_path)
         if size_after is not None:
-            self._size_cache[event.src_path] = size_after
+            self._size_put(event.src_path, size_after)
 
         pid, pname = get_process_info()
-        _, ext = os.path.splitext(event.src_path)
 
         self.event_logger.log_event(
             event_type="modified",
@@ -193,16 +379,14 @@ class RansomwareEventHandler(FileSystemEventHandler):
         logger.info("MODIFIED: %s (pid=%s, %s)", event.src_path, pid, pname)
 
         entropy_delta = None
-        if self.entropy_detector:
-            result = self.entropy_detector.analyze_file(event.src_path)
-            if result:
-                entropy_delta = result.get("delta")
-                if result["suspicious"]:
-                    logger.warning(
-                        "ENTROPY ALERT on modify: %s (%.2f -> %.2f, delta=%.2f)",
-                        event.src_path, result["entropy_before"] or 0.0,
-                        result["entropy_after"], result["delta"],
-                    )
+        if result:
+            entropy_delta = result.get("delta")
+            if result["suspicious"]:
+                logger.warning(
+                    "ENTROPY ALERT on modify: %s (%.2f -> %.2f, delta=%.2f)",
+                    event.src_path, result["entropy_before"] or 0.0,
+                    result["entropy_after"], result["delta"],
+                )
 
         if self.behavior_analyzer:
             self.behavior_analyzer.process_event(
@@ -215,20 +399,21 @@ class RansomwareEventHandler(FileSystemEventHandler):
             )
 
     def on_deleted(self, event):
+        # The file is gone, so a deferred modify has nothing left to read
+        self._drop_trailing(event.src_path)
         try:
-            self._handle_deleted(event)
+            with self._handle_lock:
+                self._handle_deleted(event)
         except Exception:
             logger.exception("Error handling deleted event for %s", event.src_path)
 
     def _handle_deleted(self, event):
-        if self._is_excluded(event.src_path):
-            return
-        if not event.is_directory and not self._passes_extension_filter(event.src_path):
+        _, ext = os.path.splitext(event.src_path)
+        if not event.is_directory and not self._passes_extension_filter(ext):
             return
 
         size_before = self._size_cache.pop(event.src_path, None)
         pid, pname = get_process_info()
-        _, ext = os.path.splitext(event.src_path)
 
         self.event_logger.log_event(
             event_type="deleted",
@@ -254,29 +439,26 @@ class RansomwareEventHandler(FileSystemEventHandler):
             )
 
     def on_moved(self, event):
+        self._drop_trailing(event.src_path)
         try:
-            self._handle_moved(event)
+            with self._handle_lock:
+                self._handle_moved(event)
         except Exception:
             logger.exception("Error handling moved event for %s", event.src_path)
 
     def _handle_moved(self, event):
-        if self._is_excluded(event.src_path) and self._is_excluded(event.dest_path):
-            return
-
         size = self._size_cache.pop(event.src_path, None)
         if size is None:
             size = get_file_size(event.dest_path)
         if size is not None:
-            self._size_cache[event.dest_path] = size
+            self._size_put(event.dest_path, size)
 
         pid, pname = get_process_info()
         _, old_ext = os.path.splitext(event.src_path)
         _, new_ext = os.path.splitext(event.dest_path)
 
         event_type = "moved"
-        if not event.is_directory and self._detect_extension_change(
-            event.src_path, event.dest_path
-        ):
+        if not event.is_directory and self._detect_extension_change(old_ext, new_ext):
             event_type = "extension_changed"
 
         self.event_logger.log_event(
@@ -331,12 +513,14 @@ class FileMonitor:
             enable_desktop_alerts=True,
         )
 
-        # Behavior analysis with threat callback
+        # Behavior analysis with threat callback, scored off the event thread
         self.behavior_analyzer = BehaviorAnalyzer(
             on_threat=lambda ts: self.response_engine.respond(ts),
+            async_evaluation=True,
         )
 
         self.observer = Observer()
+        self.handler: RansomwareEventHandler | None = None
         self._running = False
 
     @staticmethod
@@ -353,7 +537,7 @@ class FileMonitor:
     def start(self):
         """Start monitoring all configured directories."""
         monitor_cfg = self.config["monitor"]
-        handler = RansomwareEventHandler(
+        handler = self.handler = RansomwareEventHandler(
             event_logger=self.event_logger,
             exclude_dirs=monitor_cfg.get("exclude_directories", []),
             extension_filter=monitor_cfg.get("file_extension_filter", []),
@@ -384,13 +568,18 @@ class FileMonitor:
 
         self.observer.start()
         self._running = True
-        logger.info("File monitor started. Watching %d directories.", scheduled)
+        # Observer is already the native backend (inotify, FSEvents, ...);
+        # name it so a fallback to stat polling is visible in the log
+        logger.info("File monitor started. Watching %d directories with %s.",
+                    scheduled, type(self.observer).__name__)
 
     def stop(self):
         """Stop monitoring and clean up."""
         if self._running:
             self.observer.stop()
             self.observer.join()
+            self.handler.close()
+            self.behavior_analyzer.close()
             self.entropy_detector.close()
             self.backup_manager.close()
             self.event_logger.close()
@@ -14,18 +14,42 @@ Alert levels map to escalation levels:
 import logging
 import subprocess
 import platform
+import threading
+from collections import deque
 from dataclasses import dataclass
 from datetime import datetime
 
+try:
+    from jeepney import DBusAddress, new_method_call
+    from jeepney.io.blocking import open_dbus_connection
+except ImportError:  # jeepney is optional; notify-send is used instead
+    open_dbus_connection = None
+else:
+    _NOTIFICATIONS = DBusAddress(
+        "/org/freedesktop/Notifications",
+        bus_name="org.freedesktop.Notifications",
+        interface="org.freedesktop.Notifications",
+    )
+
 logger = logging.getLogger(__name__)
 
 ALERT_INFO = "INFO"
 ALERT_WARNING = "WARNING"
 ALERT_CRITICAL = "CRITICAL"
 ALERT_EMERGENCY = "EMERGENCY"
+ALERT_LOG_SIZE = 10_000  # most recent alerts kept in memory
+
+_URGENCY = {
+    ALERT_INFO: "low",
+    ALERT_WARNING: "normal",
+    ALERT_CRITICAL: "critical",
+    ALERT_EMERGENCY: "critical",
+}
+# Byte values of the freedesktop "urgency" hint
+_URGENCY_BYTE = {"low": 0, "normal": 1, "critical": 2}
 
 
-@dataclass
+@dataclass(slots=True)
 class Alert:
     """Record of an alert sent to the user."""
     timestamp: str
@@ -46,10 +70,15 @@ class AlertSystem:
     keep the system non-blocking.
     """
 
-    def __init__(self, enable_desktop: bool = True):
+    def __init__(self, enable_desktop: bool = True, log_size: int = ALERT_LOG_SIZE):
         self.enable_desktop = enable_desktop
-        self._alert_log: list[Alert] = []
+        # Oldest alerts fall off once log_size is reached
+        self._alert_log: deque[Alert] = deque(maxlen=log_size)
         self._system = platform.system()
+        # Session-bus connection for Linux notifications, opened on first
+        # use; False once it has failed, so notify-send is used from then on
+        self._dbus = None
+        self._dbus_lock = threading.Lock()
 
     def send(
         self,
@@ -96,12 +125,9 @@ class AlertSystem:
         """Try platform-specific desktop notification. Returns success."""
         try:
             if self._system == "Linux":
-                urgency = {
-                    ALERT_INFO: "low",
-                    ALERT_WARNING: "normal",
-                    ALERT_CRITICAL: "critical",
-                    ALERT_EMERGENCY: "critical",
-                }.get(level, "normal")
+                urgency = _URGENCY.get(level, "normal")
+                if self._dbus_notify(urgency, title, message):
+                    return True
                 subprocess.Popen(
                     ["notify-send", "-u", urgency, title, message],
                     stdout=subprocess.DEVNULL,
@@ -121,9 +147,38 @@ class AlertSystem:
         except (FileNotFoundError, OSError):
             return False
 
+    def _dbus_notify(self, urgency: str, title: str, message: str) -> bool:
+        """Send a notification straight over D-Bus, without forking.
+
+        Returns False if jeepney or the session bus is unavailable.
+        """
+        if open_dbus_connection is None:
+            return False
+        with self._dbus_lock:
+            if self._dbus is False:
+                return False
+            try:
+                if self._dbus is None:
+                    self._dbus = open_dbus_connection(bus="SESSION")
+                msg = new_method_call(
+                    _NOTIFICATIONS, "Notify", "susssasa{sv}i",
+                    ("ransomware-detector", 0, "", title, message, [],
+                     {"urgency": ("y", _URGENCY_BYTE[urgency])}, -1),
+                )
+                self._dbus.send(msg)
+                return True
+            except Exception:
+                logger.debug("D-Bus notification failed; using notify-send",
+                             exc_info=True)
+                if self._dbus:
+                    self._dbus.close()
+                self._dbus = False
+                return False
+
     @property
     def alert_log(self) -> list[Alert]:
         return list(self._alert_log)
 
     def get_alerts_by_level(self, level: str) -> list[Alert]:
-        return [a for a in self._alert_log if a.level == level]
+        # Filter a copy: a deque raises if appended to mid-iteration
+        return [a for a in list(self._alert_log) if a.level == level]
@@ -11,7 +11,7 @@ from datetime import datetime, timedelta
 from pathlib import Path
 
 from src.response.backup_config import RETENTION_HOURS, SNAPSHOT_DIR_FORMAT
-from src.response.snapshot_service import SnapshotService
+from src.response.snapshot_service import SnapshotService, file_sha256
 from src.response.recovery_manager import RecoveryManager
 
 logger = logging.getLogger(__name__)
@@ -49,6 +49,48 @@ class BackupManager:
             process_name=process_name,
         )
 
+    def backup_files(
+        self,
+        original_paths: list[str],
+        reason: str = "routine",
+        process_name: str | None = None,
+    ) -> list[dict | None]:
+        """Back up several files in one batch.
+
+        Returns one snapshot metadata dict (or None on failure) per path.
+        A path listed twice is backed up once. A file whose content still
+        matches its newest backup, with that vault copy intact, isn't
+        copied again: a new index row for this reason and process points
+        at the existing copy instead.
+        """
+        unique = list(dict.fromkeys(original_paths))
+        latest = self.snapshot.get_latest_backups(unique)
+        results: dict[str, dict | None] = {}
+        to_copy = []
+        reusable = []
+        for path in unique:
+            record = latest.get(path)
+            if (record and record["file_hash"]
+                    and file_sha256(path) == record["file_hash"]
+                    and os.path.isfile(record["backup_path"])
+                    and self.recovery._integrity_ok(record)):
+                reusable.append(record)
+            else:
+                to_copy.append(path)
+        if reusable:
+            reused = self.snapshot.record_existing_backups(
+                reusable, reason=reason, process_name=process_name,
+            )
+            results.update((r["original_path"], r) for r in reused)
+        if to_copy:
+            created = self.snapshot.create_snapshots(
+                original_paths=to_copy,
+                reason=reason,
+                process_name=process_name,
+            )
+            results.update(zip(to_copy, created))
+        return [results[path] for path in original_paths]
+
     def enforce_retention(self):
         """Delete snapshot directories older than the retention window.
 
@@ -57,37 +99,56 @@ class BackupManager:
         cutoff = datetime.now() - timedelta(hours=self.retention_hours)
         cutoff_str = cutoff.isoformat()
 
-        # Remove database records
+        # Remove database records, collecting their paths in the same statement
         conn = self.snapshot._get_connection()
         old_rows = conn.execute(
-            "SELECT backup_path FROM backups WHERE timestamp < ?", (cutoff_str,)
+            "DELETE FROM backups WHERE timestamp < ? RETURNING backup_path",
+            (cutoff_str,),
         ).fetchall()
-        conn.execute("DELETE FROM backups WHERE timestamp < ?", (cutoff_str,))
+        if not old_rows:
+            conn.commit()
+            return
+        # A vault copy can be indexed more than once (see backup_files);
+        # it stays while any row still points at it
+        in_use = self.snapshot.referenced_backup_paths(
+            [row["backup_path"] for row in old_rows]
+        )
+        conn.executemany(
+            "DELETE FROM backup_blocks WHERE backup_path = ?",
+            [(row["backup_path"],) for row in old_rows
+             if row["backup_path"] not in in_use],
+        )
+        # Directories (with trailing separator) still holding a live backup;
+        # rtrim strips the file name off each path
+        live_dirs = {
+            row[0] for row in conn.execute(
+                "SELECT DISTINCT rtrim(backup_path, replace(backup_path, ?, '')) "
+                "FROM backups",
+                (os.sep,),
+            )
+        }
         conn.commit()
 
-        # Remove snapshot directories that are now empty or entirely stale
-        removed_dirs: set[str] = set()
+        # Snapshot directories with no live backup are removed whole; in the
+        # rest only the expired files go
+        stale_dirs: set[str] = set()
         for row in old_rows:
             bp = row["backup_path"]
+            if bp in in_use:
+                continue
             parent = os.path.dirname(bp)
+            if parent + os.sep not in live_dirs:
+                stale_dirs.add(parent)
+                continue
             try:
-                if os.path.isfile(bp):
-                    os.remove(bp)
+                os.remove(bp)
             except OSError:
                 pass
-            removed_dirs.add(parent)
 
-        for d in removed_dirs:
-            try:
-                # Remove directory if empty (or only metadata.json left)
-                remaining = os.listdir(d)
-                if not remaining or remaining == ["metadata.json"]:
-                    shutil.rmtree(d, ignore_errors=True)
-            except OSError:
-                pass
+        for d in stale_dirs:
+            shutil.rmtree(d, ignore_errors=True)
 
-        if old_rows:
-            logger.info("Retention cleanup: removed %d old backup(s)", len(old_rows))
+        logger.info("Retention cleanup: removed %d old backup(s)", len(old_rows))
 
     def close(self):
         self.snapshot.close()
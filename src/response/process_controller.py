@@ -6,15 +6,34 @@ identified by PID, using psutil.
 
 import logging
 import os
+import time
+from collections import defaultdict, deque
 from dataclasses import dataclass, field
 from datetime import datetime
+from functools import lru_cache
 
 import psutil
 
 logger = logging.getLogger(__name__)
 
+# One scan of the process table answers every tree lookup made within
+# this many seconds, e.g. for a burst of threats from related processes
+PPID_MAP_TTL = 0.2
 
-@dataclass
+ACTION_LOG_SIZE = 10_000  # most recent process actions kept in memory
+
+
+@lru_cache(maxsize=1024)
+def _normalize_exe(path: str) -> str:
+    """Canonical form of an executable path for the blocked list.
+
+    ``normcase`` folds case (and separators) on Windows, where
+    ``C:\\Tools\\Evil.exe`` and ``c:/tools/evil.exe`` are the same file.
+    """
+    return os.path.normcase(os.path.normpath(path))
+
+
+@dataclass(slots=True)
 class ProcessAction:
     """Record of an action taken on a process."""
     timestamp: str
@@ -28,10 +47,30 @@ class ProcessAction:
 class ProcessController:
     """Manages process suspension, termination, and blocking."""
 
-    def __init__(self):
+    def __init__(self, log_size: int = ACTION_LOG_SIZE):
         # Blocked executables: set of normalized executable paths
         self._blocked: set[str] = set()
-        self._action_log: list[ProcessAction] = []
+        # Oldest actions fall off once log_size is reached
+        self._action_log: deque[ProcessAction] = deque(maxlen=log_size)
+        # psutil handles for PIDs acted on, reused so that follow-up actions
+        # (suspend, then terminate or resume) skip the lookups psutil caches
+        self._procs: dict[int, psutil.Process] = {}
+        # (taken_at, parent pid -> child pids)
+        self._children_snapshot: tuple[float, dict[int, list[int]]] | None = None
+
+    def _get(self, pid: int) -> psutil.Process:
+        """Return a psutil handle for ``pid``, reusing a cached one.
+
+        A cached handle is only reused while ``is_running()`` confirms its
+        creation time still matches, so a recycled PID gets a fresh one.
+        """
+        proc = self._procs.get(pid)
+        if proc is not None and proc.is_running():
+            return proc
+        self._procs.pop(pid, None)
+        proc = psutil.Process(pid)
+        self._procs[pid] = proc
+        return proc
 
     def _log_action(self, pid: int, name: str | None, action: str,
                     success: bool, error: str | None = None) -> ProcessAction:
@@ -49,77 +88,132 @@ class ProcessController:
     def suspend(self, pid: int) -> ProcessAction:
         """Suspend (pause) a process by PID."""
         try:
-            proc = psutil.Process(pid)
+            proc = self._get(pid)
             name = proc.name()
             proc.suspend()
             logger.warning("Suspended process pid=%d (%s)", pid, name)
             return self._log_action(pid, name, "suspend", True)
         except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess) as exc:
             logger.error("Failed to suspend pid=%d: %s", pid, exc)
+            self._procs.pop(pid, None)
             return self._log_action(pid, None, "suspend", False, str(exc))
 
     def resume(self, pid: int) -> ProcessAction:
         """Resume a previously suspended process."""
         try:
-            proc = psutil.Process(pid)
+            proc = self._get(pid)
             name = proc.name()
             proc.resume()
             logger.info("Resumed process pid=%d (%s)", pid, name)
             return self._log_action(pid, name, "resume", True)
         except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess) as exc:
             logger.error("Failed to resume pid=%d: %s", pid, exc)
+            self._procs.pop(pid, None)
             return self._log_action(pid, None, "resume", False, str(exc))
 
     def terminate(self, pid: int) -> ProcessAction:
         """Terminate (kill) a process by PID."""
         try:
-            proc = psutil.Process(pid)
+            proc = self._get(pid)
             name = proc.name()
             proc.terminate()
             logger.warning("Terminated process pid=%d (%s)", pid, name)
             return self._log_action(pid, name, "terminate", True)
         except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess) as exc:
             logger.error("Failed to terminate pid=%d: %s", pid, exc)
+            self._procs.pop(pid, None)
             return self._log_action(pid, None, "terminate", False, str(exc))
 
     def block_executable(self, pid: int) -> ProcessAction:
         """Add the executable behind a PID to the blocked list."""
         try:
-            proc = psutil.Process(pid)
-            name = proc.name()
-            exe = proc.exe()
-            self._blocked.add(os.path.normpath(exe))
+            proc = self._get(pid)
+            with proc.oneshot():
+                name = proc.name()
+                exe = proc.exe()
+            self._blocked.add(_normalize_exe(exe))
             logger.warning("Blocked executable: %s (pid=%d)", exe, pid)
             return self._log_action(pid, name, "block", True)
         except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess) as exc:
             logger.error("Failed to block pid=%d: %s", pid, exc)
+            self._procs.pop(pid, None)
             return self._log_action(pid, None, "block", False, str(exc))
 
     def is_blocked(self, exe_path: str) -> bool:
         """Check if an executable path is on the blocked list."""
-        return os.path.normpath(exe_path) in self._blocked
+        return _normalize_exe(exe_path) in self._blocked
+
+    def _children_map(self) -> dict[int, list[int]]:
+        """Map each PID to its direct children, from a recent table scan."""
+        snapshot = self._children_snapshot
+        now = time.monotonic()
+        if snapshot is not None and now - snapshot[0] < PPID_MAP_TTL:
+            return snapshot[1]
+        # psutil's own children() uses this platform helper; fall back to a
+        # public scan where it isn't available
+        ppid_map = getattr(psutil._psplatform, "ppid_map", None)
+        if ppid_map is not None:
+            parents = ppid_map()
+        else:
+            parents = {
+                p.info["pid"]: p.info["ppid"]
+                for p in psutil.process_iter(["pid", "ppid"])
+            }
+        children = defaultdict(list)
+        for child, parent in parents.items():
+            children[parent].append(child)
+        self._children_snapshot = (now, children)
+        return children
+
+    def _descendants(self, proc: psutil.Process) -> list[psutil.Process]:
+        """All descendants of ``proc``, like ``children(recursive=True)``."""
+        children = self._children_map()
+        root_created = proc.create_time()
+        found = []
+        queue = deque(children.get(proc.pid, ()))
+        seen = set(queue)
+        while queue:
+            pid = queue.popleft()
+            try:
+                child = psutil.Process(pid)
+                # A child can't predate its parent; if it seems to, the
+                # parent PID was reused and this is someone else's process
+                if child.create_time() < root_created:
+                    continue
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+            found.append(child)
+            for grandchild in children.get(pid, ()):
+                if grandchild not in seen:
+                    seen.add(grandchild)
+                    queue.append(grandchild)
+        return found
 
     def get_process_tree(self, pid: int) -> list[dict] | None:
         """Return the process tree (parent + children) for logging."""
         try:
-            proc = psutil.Process(pid)
-            tree = [{
-                "pid": proc.pid,
-                "name": proc.name(),
-                "status": proc.status(),
-                "exe": proc.exe() if proc.is_running() else None,
-            }]
-            for child in proc.children(recursive=True):
+            proc = self._get(pid)
+            # oneshot() lets name and status share one read of the process
+            with proc.oneshot():
+                tree = [{
+                    "pid": proc.pid,
+                    "name": proc.name(),
+                    "status": proc.status(),
+                    "exe": proc.exe() if proc.is_running() else None,
+                }]
+            for child in self._descendants(proc):
                 try:
-                    tree.append({
-                        "pid": child.pid,
-                        "name": child.name(),
-                        "status": child.status(),
-                    })
+                    with child.oneshot():
+                        tree.append({
+                            "pid": child.pid,
+                            "name": child.name(),
+                            "status": child.status(),
+                        })
                 except (psutil.NoSuchProcess, psutil.AccessDenied):
                     continue
             return tree
         except (psutil.NoSuchProcess, psutil.AccessDenied):
+            self._procs.pop(pid, None)
             return None
 
     @property
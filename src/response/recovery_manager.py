@@ -4,7 +4,7 @@ Supports:
 - Restoring individual files or entire directories
 - Point-in-time recovery
 - Restore all files modified by a specific process
-- Batch restoration
+- Batch restoration (one index query, parallel copies)
 - Integrity verification via SHA-256
 """
 
@@ -12,15 +12,38 @@ import hashlib
 import logging
 import os
 import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Callable
 
-from src.response.snapshot_service import SnapshotService, file_sha256
+from src.response.snapshot_service import (
+    SnapshotService,
+    copy_verified,
+    file_sha256,
+    verify_blocks,
+)
 
 logger = logging.getLogger(__name__)
 
+RESTORE_WORKERS = 8  # parallel copies for batch restores
 
-@dataclass
+
+def _keep_owner(original_path: str, new_path: str):
+    """Give ``new_path`` the owner of the file it is about to replace."""
+    try:
+        st = os.stat(original_path)
+    except OSError:
+        return
+    if hasattr(os, "chown"):
+        try:
+            os.chown(new_path, st.st_uid, st.st_gid)
+        except OSError:
+            pass
+
+
+@dataclass(slots=True)
 class RestoreResult:
     original_path: str
     backup_path: str
@@ -46,6 +69,54 @@ class RecoveryManager:
             )
         return self._do_restore(record)
 
+    def restore_files(
+        self,
+        backup_ids: list[int],
+        on_result: Callable[[RestoreResult], None] | None = None,
+    ) -> list[RestoreResult]:
+        """Restore several backups at once. Results follow ``backup_ids`` order.
+
+        All records are fetched in one query, and independent files are
+        verified and copied in parallel. Backups that target the same
+        original path are restored one after another in the order given,
+        so the last one wins, as it would if they were restored one by one.
+
+        ``on_result``, if given, is called with each result as soon as it
+        is ready, possibly from a worker thread.
+        """
+        records = self.snapshot.get_backups_by_ids(backup_ids)
+        results: list[RestoreResult | None] = [None] * len(backup_ids)
+
+        def finish(i: int, result: RestoreResult):
+            results[i] = result
+            if on_result is not None:
+                on_result(result)
+
+        groups: dict[str, list[tuple[int, dict]]] = {}
+        for i, bid in enumerate(backup_ids):
+            record = records.get(bid)
+            if record is None:
+                finish(i, RestoreResult(
+                    original_path="", backup_path="",
+                    success=False, integrity_ok=None,
+                    error=f"Backup ID {bid} not found",
+                ))
+            else:
+                groups.setdefault(record["original_path"], []).append((i, record))
+
+        def restore_group(group: list[tuple[int, dict]]):
+            for i, record in group:
+                finish(i, self._do_restore(record))
+
+        if len(groups) <= 1:
+            for group in groups.values():
+                restore_group(group)
+        else:
+            workers = min(RESTORE_WORKERS, len(groups))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(restore_group, groups.values()))
+        return results
+
     def restore_by_path(self, original_path: str, latest: bool = True) -> list[RestoreResult]:
         """Restore backups for a specific original path.
 
@@ -65,31 +136,19 @@ class RecoveryManager:
 
     def restore_by_process(self, process_name: str) -> list[RestoreResult]:
         """Restore all files that were backed up due to a specific process."""
-        backups = self.snapshot.get_backups(process_name=process_name)
+        backups = self.snapshot.get_latest_backups_per_path(process_name=process_name)
         if not backups:
             return [RestoreResult(
                 original_path="", backup_path="",
                 success=False, integrity_ok=None,
                 error=f"No backups for process {process_name}",
             )]
-
-        # Deduplicate: keep only the latest backup per original_path
-        seen: dict[str, dict] = {}
-        for b in backups:
-            if b["original_path"] not in seen:
-                seen[b["original_path"]] = b
-        return [self._do_restore(b) for b in seen.values()]
+        return self._restore_latest(backups)
 
     def restore_point_in_time(self, since: str) -> list[RestoreResult]:
         """Restore all files backed up since a given ISO timestamp."""
-        backups = self.snapshot.get_backups(since=since, limit=10000)
-        if not backups:
-            return []
-        seen: dict[str, dict] = {}
-        for b in backups:
-            if b["original_path"] not in seen:
-                seen[b["original_path"]] = b
-        return [self._do_restore(b) for b in seen.values()]
+        backups = self.snapshot.get_latest_backups_per_path(since=since)
+        return self._restore_latest(backups)
 
     def verify_backup(self, backup_id: int) -> bool | None:
         """Check whether a backup file still matches its recorded SHA-256.
@@ -99,16 +158,33 @@ class RecoveryManager:
         record = self.snapshot.get_backup_by_id(backup_id)
         if not record:
             return None
-        stored_hash = record.get("file_hash")
-        if not stored_hash:
-            return None
-        current_hash = file_sha256(record["backup_path"])
-        return current_hash == stored_hash
+        return self._integrity_ok(record)
 
     # ------------------------------------------------------------------
     # Internal
     # ------------------------------------------------------------------
 
+    def _restore_latest(self, records: list[dict]) -> list[RestoreResult]:
+        """Restore one backup per original path, copying in parallel."""
+        if len(records) <= 1:
+            return [self._do_restore(r) for r in records]
+        with ThreadPoolExecutor(max_workers=min(RESTORE_WORKERS, len(records))) as pool:
+            return list(pool.map(self._do_restore, records))
+
+    def _integrity_ok(self, record: dict) -> bool | None:
+        """Check a backup file against its recorded hashes.
+
+        Large backups are checked block by block where block digests were
+        stored. Returns None if the backup has no recorded hash.
+        """
+        stored_hash = record.get("file_hash")
+        if not stored_hash:
+            return None
+        block_hashes = self.snapshot.get_block_hashes(record["backup_path"])
+        if block_hashes is not None:
+            return verify_blocks(record["backup_path"], block_hashes)
+        return file_sha256(record["backup_path"]) == stored_hash
+
     def _do_restore(self, record: dict) -> RestoreResult:
         backup_path = record["backup_path"]
         original_path = record["original_path"]
@@ -120,26 +196,34 @@ class RecoveryManager:
                 error="Backup file missing from vault",
             )
 
-        # Verify integrity before restoring
-        stored_hash = record.get("file_hash")
-        integrity_ok = None
-        if stored_hash:
-            current_hash = file_sha256(backup_path)
-            integrity_ok = (current_hash == stored_hash)
-            if not integrity_ok:
+        # Copy to a temporary file beside the original, verifying the data
+        # as it streams, and only move it into place if it checks out
+        directory = os.path.dirname(original_path)
+        tmp_path = None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".restore-")
+            with os.fdopen(fd, "wb") as dst:
+                integrity_ok = copy_verified(
+                    backup_path, dst, record.get("file_hash"),
+                    self.snapshot.get_block_hashes(backup_path),
+                )
+            if integrity_ok is False:
+                os.unlink(tmp_path)
                 return RestoreResult(
                     original_path=original_path, backup_path=backup_path,
                     success=False, integrity_ok=False,
                     error="Integrity check failed: hash mismatch",
                 )
-
-        try:
-            os.makedirs(os.path.dirname(original_path), exist_ok=True)
-            shutil.copy2(backup_path, original_path)
+            shutil.copystat(backup_path, tmp_path)
+            _keep_owner(original_path, tmp_path)
+            os.replace(tmp_path, original_path)
         except OSError as exc:
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
             return RestoreResult(
                 original_path=original_path, backup_path=backup_path,
-                success=False, integrity_ok=integrity_ok,
+                success=False, integrity_ok=None,
                 error=str(exc),
             )
 
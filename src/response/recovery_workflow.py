@@ -14,16 +14,24 @@ Also generates incident reports for Level 4 escalation.
 
 import json
 import logging
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib codec is used instead
+    orjson = None
+
 from src.response.backup_manager import BackupManager
 from src.response.recovery_manager import RestoreResult
 
 logger = logging.getLogger(__name__)
 
+INCIDENT_LOG_SIZE = 10_000  # most recent incident reports kept in memory
+
 
-@dataclass
+@dataclass(slots=True)
 class IncidentReport:
     """Full incident report for Level 4 / post-incident review."""
     timestamp: str
@@ -48,15 +56,18 @@ class IncidentReport:
         }
 
     def to_json(self) -> str:
+        if orjson is not None:
+            return orjson.dumps(self.to_dict(), option=orjson.OPT_INDENT_2).decode()
         return json.dumps(self.to_dict(), indent=2)
 
 
 class RecoveryWorkflow:
     """Orchestrates the guided recovery process."""
 
-    def __init__(self, backup_manager: BackupManager):
+    def __init__(self, backup_manager: BackupManager, log_size: int = INCIDENT_LOG_SIZE):
         self.backup = backup_manager
-        self._incidents: list[IncidentReport] = []
+        # Oldest reports fall off once log_size is reached
+        self._incidents: deque[IncidentReport] = deque(maxlen=log_size)
 
     def get_affected_files(self, process_name: str) -> list[dict]:
         """Return backups associated with a process (step 3: show affected files)."""
@@ -78,10 +89,15 @@ class RecoveryWorkflow:
         triggered_indicators: dict[str, str],
         actions_taken: list[str],
         restore_results: list[RestoreResult] | None = None,
+        affected_files: list[str] | None = None,
     ) -> IncidentReport:
-        """Generate a full incident report (Level 4 requirement)."""
-        affected = []
-        if process_name:
+        """Generate a full incident report (Level 4 requirement).
+
+        ``affected_files`` saves a backup-index query when the caller
+        already knows them, e.g. from the rollback it just ran.
+        """
+        affected = affected_files or []
+        if affected_files is None and process_name:
             affected = [b["original_path"]
                         for b in self.get_affected_files(process_name)]
 
@@ -15,6 +15,8 @@ caller can present it for confirmation and then call ``confirm()``.
 """
 
 import logging
+from bisect import bisect_left
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime
 
@@ -43,6 +45,8 @@ LEVEL3_MAX = 85
 LEVEL4_MIN = 86
 LEVEL4_MAX = 100
 
+RESPONSE_LOG_SIZE = 10_000  # most recent responses kept in memory
+
 
 def escalation_level(score: int) -> int:
     """Map a threat score to an escalation level (0-4)."""
@@ -57,7 +61,7 @@ def escalation_level(score: int) -> int:
     return 0
 
 
-@dataclass
+@dataclass(slots=True)
 class ResponseResult:
     """Record of all actions taken for one response cycle."""
     timestamp: str
@@ -68,6 +72,32 @@ class ResponseResult:
     process_actions: list[ProcessAction] = field(default_factory=list)
     incident_report: IncidentReport | None = None
     pending_confirmation: bool = False
+    # Fields of to_dict() that never change after creation, built on first use
+    _api_base: dict | None = field(default=None, init=False, repr=False, compare=False)
+
+    def to_dict(self) -> dict:
+        """API form of this result, as served by ``/api/threats``."""
+        base = self._api_base
+        if base is None:
+            ts = self.threat_score
+            base = self._api_base = {
+                "timestamp": self.timestamp,
+                "process_id": ts.process_id,
+                "process_name": ts.process_name,
+                "score": ts.score,
+                "level": ts.level,
+                "escalation_level": self.escalation_level,
+                "triggered_indicators": ts.triggered_indicators,
+            }
+        entry = dict(base)
+        entry["actions_taken"] = self.actions_taken
+        if self.incident_report:
+            entry["incident_report"] = self.incident_report.to_dict()
+        return entry
+
+
+def _timestamp_of(result: ResponseResult) -> str:
+    return result.timestamp
 
 
 class ResponseEngine:
@@ -83,6 +113,8 @@ class ResponseEngine:
         stored and can be executed via ``confirm()``.
     enable_desktop_alerts:
         Pass through to AlertSystem.
+    log_size:
+        Number of recent responses kept in ``response_log``.
     """
 
     def __init__(
@@ -90,6 +122,7 @@ class ResponseEngine:
         backup_manager: BackupManager,
         safe_mode: bool = False,
         enable_desktop_alerts: bool = True,
+        log_size: int = RESPONSE_LOG_SIZE,
     ):
         self.process_ctrl = ProcessController()
         self.alerts = AlertSystem(enable_desktop=enable_desktop_alerts)
@@ -97,7 +130,15 @@ class ResponseEngine:
         self.workflow = RecoveryWorkflow(backup_manager)
         self.safe_mode = safe_mode
 
-        self._response_log: list[ResponseResult] = []
+        # Oldest responses fall off once log_size is reached
+        self._log_size = log_size
+        self._response_log: deque[ResponseResult] = deque(maxlen=log_size)
+        # Level 1+ results, overall and per escalation level, in time order
+        # and capped at log_size like the response log
+        self._threat_log: list[ResponseResult] = []
+        self._threat_index: dict[int, list[ResponseResult]] = {
+            lvl: [] for lvl in range(1, 5)
+        }
         self._pending: ResponseResult | None = None
 
     # ------------------------------------------------------------------
@@ -114,7 +155,7 @@ class ResponseEngine:
         )
 
         if level == 0:
-            self._response_log.append(result)
+            self._record(result)
             return result
 
         if level >= 1:
@@ -140,14 +181,14 @@ class ResponseEngine:
                 )
                 result.alerts_sent.append(alert)
                 self._pending = result
-                self._response_log.append(result)
+                self._record(result)
                 return result
             # Not safe mode: execute immediately
             self._level3(threat, result, affected_files)
         if level >= 4 and not self.safe_mode:
             self._level4(threat, result, affected_files)
 
-        self._response_log.append(result)
+        self._record(result)
         return result
 
     def confirm(self) -> ResponseResult | None:
@@ -179,6 +220,25 @@ class ResponseEngine:
         self._pending = None
         return result
 
+    def _record(self, result: ResponseResult):
+        self._response_log.append(result)
+        if result.escalation_level > 0:
+            self._threat_log = self._capped(self._threat_log, result)
+            lvl = result.escalation_level
+            self._threat_index[lvl] = self._capped(self._threat_index[lvl], result)
+
+    def _capped(self, log: list[ResponseResult], result: ResponseResult) -> list[ResponseResult]:
+        """Append ``result``; once full, return a new list without the oldest.
+
+        A full log is replaced rather than trimmed in place, so a
+        ``recent_threats`` call already holding the old list still sees
+        consistent indices for its bisection.
+        """
+        if len(log) < self._log_size:
+            log.append(result)
+            return log
+        return log[len(log) - self._log_size + 1:] + [result]
+
     # ------------------------------------------------------------------
     # Escalation level implementations
     # ------------------------------------------------------------------
@@ -206,11 +266,10 @@ class ResponseEngine:
         """Level 2 (51-70): Warn - backup, prominent warning, log process tree."""
         # Create immediate backup snapshots
         if affected_files:
-            for fpath in affected_files:
-                self.backup.backup_file(
-                    fpath, reason="level2_warning",
-                    process_name=threat.process_name,
-                )
+            self.backup.backup_files(
+                affected_files, reason="level2_warning",
+                process_name=threat.process_name,
+            )
             result.actions_taken.append(
                 f"Immediate backup of {len(affected_files)} file(s)"
             )
@@ -256,11 +315,10 @@ class ResponseEngine:
 
         # Create emergency backups
         if affected_files:
-            for fpath in affected_files:
-                self.backup.backup_file(
-                    fpath, reason="emergency_quarantine",
-                    process_name=threat.process_name,
-                )
+            self.backup.backup_files(
+                affected_files, reason="emergency_quarantine",
+                process_name=threat.process_name,
+            )
             result.actions_taken.append(
                 f"Emergency backup of {len(affected_files)} file(s)"
             )
@@ -302,8 +360,12 @@ class ResponseEngine:
 
         # Initiate automatic rollback
         restore_results = []
+        rolled_back = None
         if threat.process_name:
             restore_results = self.workflow.auto_restore(threat.process_name)
+            # One result per backed-up path; a lone failure with no path
+            # means the process had no backups
+            rolled_back = [r.original_path for r in restore_results if r.original_path]
             succeeded = sum(1 for r in restore_results if r.success)
             result.actions_taken.append(
                 f"Automatic rollback: {succeeded}/{len(restore_results)} file(s) restored"
@@ -317,6 +379,7 @@ class ResponseEngine:
             triggered_indicators=threat.triggered_indicators,
             actions_taken=result.actions_taken,
             restore_results=restore_results or None,
+            affected_files=rolled_back,
         )
         result.incident_report = report
 
@@ -342,6 +405,28 @@ class ResponseEngine:
     def response_log(self) -> list[ResponseResult]:
         return list(self._response_log)
 
+    def recent_threats(
+        self,
+        level: int | None = None,
+        since: str | None = None,
+        limit: int | None = None,
+    ) -> list[ResponseResult]:
+        """Return level 1+ results newest first.
+
+        Optionally restricted to one escalation level, to results at or
+        after ``since`` (ISO timestamp), and to at most ``limit`` entries.
+        The logs are appended in time order, so ``since`` is found by
+        bisection and only the returned slice is copied.
+        """
+        log = self._threat_log if level is None else self._threat_index.get(level, [])
+        end = len(log)
+        start = 0
+        if since:
+            start = bisect_left(log, since, hi=end, key=_timestamp_of)
+        if limit is not None:
+            start = max(start, end - max(0, limit))
+        return log[start:end][::-1]
+
     @property
     def pending(self) -> ResponseResult | None:
         return self._pending
@@ -23,10 +23,20 @@ import shutil
 import sqlite3
 import stat
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib codec is used instead
+    orjson = None
+
 MIN_DISK_SPACE_BYTES = 100 * 1024 * 1024  # 100 MB minimum free space
+_MAX_IN_PARAMS = 500  # IDs per "WHERE id IN (...)" query
+BACKUP_WORKERS = 8  # parallel copies for batch backups
+HASH_CHUNK_SIZE = 1024 * 1024  # read size when hashing backups
+VERIFY_BLOCK_SIZE = 4 * 1024 * 1024  # block size for per-block backup hashes
 
 from src.response.backup_config import (
     DEFAULT_VAULT_PATH,
@@ -42,14 +52,134 @@ def file_sha256(path: str) -> str | None:
     """Return hex SHA-256 digest of a file, or None if unreadable."""
     h = hashlib.sha256()
     try:
-        with open(path, "rb") as f:
-            for chunk in iter(lambda: f.read(65536), b""):
-                h.update(chunk)
+        # Unbuffered reads into one reused buffer, sized to the file up to
+        # HASH_CHUNK_SIZE: no per-chunk bytes objects, and large updates let
+        # hashlib release the GIL for parallel verification. (mmap would
+        # save the copy, but a vault file truncated while mapped would
+        # crash the process with SIGBUS.)
+        with open(path, "rb", buffering=0) as f:
+            size = os.fstat(f.fileno()).st_size
+            buf = memoryview(bytearray(max(1, min(size, HASH_CHUNK_SIZE))))
+            while n := f.readinto(buf):
+                h.update(buf[:n])
         return h.hexdigest()
     except OSError:
         return None
 
 
+def file_sha256_blocks(path: str) -> tuple[str, bytes | None] | None:
+    """Return a file's hex SHA-256 and its per-block SHA-256 digests.
+
+    The block digests (32 bytes per VERIFY_BLOCK_SIZE block, concatenated)
+    let ``verify_blocks`` check a large file in parallel and stop at the
+    first bad block. For a file of one block or less they add nothing, so
+    None is returned in their place. Returns None if the file is unreadable.
+    """
+    try:
+        if os.path.getsize(path) <= VERIFY_BLOCK_SIZE:
+            whole = file_sha256(path)
+            return (whole, None) if whole is not None else None
+        h = hashlib.sha256()
+        block = hashlib.sha256()
+        block_fill = 0
+        digests = []
+        with open(path, "rb", buffering=0) as f:
+            buf = memoryview(bytearray(HASH_CHUNK_SIZE))
+            while n := f.readinto(buf):
+                view = buf[:n]
+                h.update(view)
+                while view:
+                    take = min(len(view), VERIFY_BLOCK_SIZE - block_fill)
+                    block.update(view[:take])
+                    block_fill += take
+                    view = view[take:]
+                    if block_fill == VERIFY_BLOCK_SIZE:
+                        digests.append(block.digest())
+                        block = hashlib.sha256()
+                        block_fill = 0
+        if block_fill:
+            digests.append(block.digest())
+        return h.hexdigest(), b"".join(digests)
+    except OSError:
+        return None
+
+
+def verify_blocks(path: str, block_hashes: bytes) -> bool:
+    """Check a file against digests from ``file_sha256_blocks``.
+
+    Blocks are hashed in parallel and the check stops at the first
+    mismatch, so a tampered file fails without being read to the end.
+    """
+    count = len(block_hashes) // 32
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return False
+    if -(-size // VERIFY_BLOCK_SIZE) != count:
+        return False
+
+    def check(i: int) -> bool:
+        with open(path, "rb", buffering=0) as f:
+            f.seek(i * VERIFY_BLOCK_SIZE)
+            data = f.read(VERIFY_BLOCK_SIZE)
+        return hashlib.sha256(data).digest() == block_hashes[i * 32:(i + 1) * 32]
+
+    try:
+        with ThreadPoolExecutor(max_workers=min(BACKUP_WORKERS, count)) as pool:
+            for ok in pool.map(check, range(count)):
+                if not ok:
+                    pool.shutdown(cancel_futures=True)
+                    return False
+    except OSError:
+        return False
+    return True
+
+
+def copy_verified(
+    src: str,
+    dst,
+    file_hash: str | None,
+    block_hashes: bytes | None = None,
+) -> bool | None:
+    """Copy ``src`` into the open binary file ``dst``, hashing as it goes.
+
+    With ``block_hashes`` each block is checked as soon as it is copied
+    and the copy stops at the first bad one; otherwise the whole-file
+    hash is compared at the end. Returns whether the data matched, or
+    None if there was no hash to check. Raises OSError on I/O failure.
+    """
+    h = hashlib.sha256() if file_hash and block_hashes is None else None
+    block = hashlib.sha256() if block_hashes is not None else None
+    block_fill = 0
+    index = 0
+    with open(src, "rb", buffering=0) as f:
+        size = os.fstat(f.fileno()).st_size
+        if block_hashes is not None and -(-size // VERIFY_BLOCK_SIZE) != len(block_hashes) // 32:
+            return False
+        buf = memoryview(bytearray(max(1, min(size, HASH_CHUNK_SIZE))))
+        while n := f.readinto(buf):
+            view = buf[:n]
+            dst.write(view)
+            if h is not None:
+                h.update(view)
+            while block is not None and view:
+                take = min(len(view), VERIFY_BLOCK_SIZE - block_fill)
+                block.update(view[:take])
+                block_fill += take
+                view = view[take:]
+                if block_fill == VERIFY_BLOCK_SIZE:
+                    if block.digest() != block_hashes[index * 32:(index + 1) * 32]:
+                        return False
+                    block = hashlib.sha256()
+                    block_fill = 0
+                    index += 1
+    if block is not None:
+        return not block_fill or block.digest() == block_hashes[index * 32:]
+    if h is not None:
+        return h.hexdigest() == file_hash
+    return None
+
+
 def flatten_path(original_path: str) -> str:
     """Convert an absolute path to a flat filename safe for any OS.
 
@@ -114,6 +244,12 @@ class SnapshotService:
                 ON backups(timestamp);
             CREATE INDEX IF NOT EXISTS idx_backups_process
                 ON backups(process_name);
+
+            -- Per-block digests for backups larger than one verify block
+            CREATE TABLE IF NOT EXISTS backup_blocks (
+                backup_path TEXT PRIMARY KEY,
+                block_hashes BLOB NOT NULL
+            );
         """)
         conn.commit()
 
@@ -133,9 +269,32 @@ class SnapshotService:
         Returns a dict with backup details or None if the source is
         unreadable.
         """
-        if not os.path.isfile(original_path):
-            logger.debug("Skipping non-file: %s", original_path)
-            return None
+        return self.create_snapshots(
+            [original_path], reason, process_name, timestamp,
+        )[0]
+
+    def create_snapshots(
+        self,
+        original_paths: list[str],
+        reason: str = "routine",
+        process_name: str | None = None,
+        timestamp: datetime | None = None,
+    ) -> list[dict | None]:
+        """Back up several files into one snapshot directory.
+
+        Files are copied and hashed in parallel; metadata.json is written
+        once and index.db gets one transaction for the whole batch. Returns
+        one ``create_snapshot``-style result per path, in order.
+        """
+        results: list[dict | None] = [None] * len(original_paths)
+        sources = []
+        for i, original_path in enumerate(original_paths):
+            if os.path.isfile(original_path):
+                sources.append((i, original_path))
+            else:
+                logger.debug("Skipping non-file: %s", original_path)
+        if not sources:
+            return results
 
         try:
             disk_usage = shutil.disk_usage(str(self.vault_path))
@@ -145,7 +304,7 @@ class SnapshotService:
                     disk_usage.free // (1024 * 1024),
                     MIN_DISK_SPACE_BYTES // (1024 * 1024),
                 )
-                return None
+                return results
         except OSError as exc:
             logger.warning("Could not check disk space: %s", exc)
 
@@ -157,98 +316,162 @@ class SnapshotService:
         except OSError:
             pass
 
-        flat_name = flatten_path(original_path)
-        dest = snapshot_dir / flat_name
-
-        # Handle duplicate names within the same second
-        counter = 1
-        while dest.exists():
-            stem, ext = os.path.splitext(flat_name)
-            dest = snapshot_dir / f"{stem}_{counter}{ext}"
-            counter += 1
-
-        try:
-            shutil.copy2(original_path, str(dest))
-        except OSError as exc:
-            logger.error("Failed to back up %s: %s", original_path, exc)
-            return None
-
-        try:
-            os.chmod(str(dest), VAULT_FILE_MODE)
-        except OSError:
-            pass
-
-        file_hash = file_sha256(str(dest))
+        # Pick destination names up front so parallel copies can't collide
+        jobs = []
+        taken: set[Path] = set()
+        for i, original_path in sources:
+            flat_name = flatten_path(original_path)
+            dest = snapshot_dir / flat_name
+
+            # Handle duplicate names within the same second
+            counter = 1
+            while dest in taken or dest.exists():
+                stem, ext = os.path.splitext(flat_name)
+                dest = snapshot_dir / f"{stem}_{counter}{ext}"
+                counter += 1
+            taken.add(dest)
+            jobs.append((i, original_path, flat_name, dest))
+
+        def copy(job) -> tuple[bool, str | None, bytes | None]:
+            """Copy one file in; returns (copied, hash, block hashes)."""
+            _, original_path, _, dest = job
+            try:
+                shutil.copy2(original_path, str(dest))
+            except OSError as exc:
+                logger.error("Failed to back up %s: %s", original_path, exc)
+                return False, None, None
+            try:
+                os.chmod(str(dest), VAULT_FILE_MODE)
+            except OSError:
+                pass
+            return (True, *(file_sha256_blocks(str(dest)) or (None, None)))
+
+        if len(jobs) == 1:
+            copies = [copy(jobs[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(BACKUP_WORKERS, len(jobs))) as pool:
+                copies = list(pool.map(copy, jobs))
+
+        stamp = ts.isoformat()
+        done = [
+            (job, file_hash) for job, (copied, file_hash, _) in zip(jobs, copies)
+            if copied
+        ]
+        blocks = [
+            (str(job[3]), block_hashes) for job, (_, _, block_hashes) in zip(jobs, copies)
+            if block_hashes is not None
+        ]
+        if not done:
+            return results
 
         # Write / update metadata.json inside the snapshot directory
-        self._write_snapshot_metadata(snapshot_dir, original_path, flat_name,
-                                      ts, file_hash, reason, process_name)
+        self._write_snapshot_metadata(snapshot_dir, [
+            {
+                "original_path": original_path,
+                "backup_filename": flat_name,
+                "timestamp": stamp,
+                "sha256": file_hash,
+                "reason": reason,
+                "process_name": process_name,
+            }
+            for (_, original_path, flat_name, _), file_hash in done
+        ])
 
         # Record in index.db
-        backup_path_str = str(dest)
         conn = self._get_connection()
-        conn.execute(
+        conn.executemany(
             """INSERT INTO backups
                (original_path, backup_path, timestamp, file_hash, reason, process_name)
                VALUES (?, ?, ?, ?, ?, ?)""",
-            (original_path, backup_path_str, ts.isoformat(), file_hash,
-             reason, process_name),
+            [
+                (original_path, str(dest), stamp, file_hash, reason, process_name)
+                for (_, original_path, _, dest), file_hash in done
+            ],
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO backup_blocks (backup_path, block_hashes) VALUES (?, ?)",
+            blocks,
         )
         conn.commit()
 
-        logger.info("Backed up %s -> %s (hash=%s)", original_path, backup_path_str,
-                     file_hash[:12] if file_hash else "N/A")
+        for (i, original_path, _, dest), file_hash in done:
+            logger.info("Backed up %s -> %s (hash=%s)", original_path, dest,
+                        file_hash[:12] if file_hash else "N/A")
+            results[i] = {
+                "original_path": original_path,
+                "backup_path": str(dest),
+                "timestamp": stamp,
+                "file_hash": file_hash,
+                "reason": reason,
+                "process_name": process_name,
+            }
+        return results
+
+    def record_existing_backups(
+        self,
+        records: list[dict],
+        reason: str = "routine",
+        process_name: str | None = None,
+        timestamp: datetime | None = None,
+    ) -> list[dict]:
+        """Index existing vault copies again under a new reason and process.
 
-        return {
-            "original_path": original_path,
-            "backup_path": backup_path_str,
-            "timestamp": ts.isoformat(),
-            "file_hash": file_hash,
-            "reason": reason,
-            "process_name": process_name,
-        }
+        Used when a file's content still matches a backup already in the
+        vault: the new row points at that copy, so restores filtered by
+        process or time find it without the file being copied twice.
+        Returns one ``create_snapshot``-style result per record, in order.
+        """
+        stamp = (timestamp or datetime.now()).isoformat()
+        results = [
+            {
+                "original_path": r["original_path"],
+                "backup_path": r["backup_path"],
+                "timestamp": stamp,
+                "file_hash": r["file_hash"],
+                "reason": reason,
+                "process_name": process_name,
+            }
+            for r in records
+        ]
+        conn = self._get_connection()
+        conn.executemany(
+            """INSERT INTO backups
+               (original_path, backup_path, timestamp, file_hash, reason, process_name)
+               VALUES (:original_path, :backup_path, :timestamp, :file_hash,
+                       :reason, :process_name)""",
+            results,
+        )
+        conn.commit()
+        return results
 
     @staticmethod
-    def _write_snapshot_metadata(
-        snapshot_dir: Path,
-        original_path: str,
-        flat_name: str,
-        ts: datetime,
-        file_hash: str | None,
-        reason: str,
-        process_name: str | None,
-    ):
+    def _write_snapshot_metadata(snapshot_dir: Path, new_entries: list[dict]):
         meta_path = snapshot_dir / "metadata.json"
         entries = []
         if meta_path.exists():
             try:
-                entries = json.loads(meta_path.read_text())
-            except (json.JSONDecodeError, OSError):
+                raw = meta_path.read_bytes()
+                entries = orjson.loads(raw) if orjson is not None else json.loads(raw)
+            except (ValueError, OSError):
                 entries = []
 
-        entries.append({
-            "original_path": original_path,
-            "backup_filename": flat_name,
-            "timestamp": ts.isoformat(),
-            "sha256": file_hash,
-            "reason": reason,
-            "process_name": process_name,
-        })
-        meta_path.write_text(json.dumps(entries, indent=2))
+        entries.extend(new_entries)
+        if orjson is not None:
+            meta_path.write_bytes(orjson.dumps(entries, option=orjson.OPT_INDENT_2))
+        else:
+            meta_path.write_text(json.dumps(entries, indent=2))
 
     # ------------------------------------------------------------------
     # Queries
     # ------------------------------------------------------------------
 
-    def get_backups(
-        self,
-        original_path: str | None = None,
-        process_name: str | None = None,
-        since: str | None = None,
-        limit: int = 100,
-    ) -> list[dict]:
-        conn = self._get_connection()
-        query = "SELECT * FROM backups WHERE 1=1"
+    @staticmethod
+    def _backup_filters(
+        original_path: str | None,
+        process_name: str | None,
+        since: str | None,
+    ) -> tuple[str, list]:
+        query = " WHERE 1=1"
         params: list = []
         if original_path:
             query += " AND original_path = ?"
@@ -259,10 +482,54 @@ class SnapshotService:
         if since:
             query += " AND timestamp >= ?"
             params.append(since)
-        query += " ORDER BY timestamp DESC LIMIT ?"
+        return query, params
+
+    def get_backups(
+        self,
+        original_path: str | None = None,
+        process_name: str | None = None,
+        since: str | None = None,
+        limit: int = 100,
+    ) -> list[dict]:
+        conn = self._get_connection()
+        where, params = self._backup_filters(original_path, process_name, since)
+        query = "SELECT * FROM backups" + where + " ORDER BY timestamp DESC LIMIT ?"
         params.append(limit)
         return [dict(r) for r in conn.execute(query, params).fetchall()]
 
+    def get_latest_backups_per_path(
+        self,
+        process_name: str | None = None,
+        since: str | None = None,
+    ) -> list[dict]:
+        """Newest matching backup of each original path, newest first.
+
+        The "latest per path" pick happens in SQLite, so superseded
+        backups never reach Python.
+        """
+        conn = self._get_connection()
+        where, params = self._backup_filters(None, process_name, since)
+        query = (
+            "SELECT * FROM backups WHERE id IN ("
+            " SELECT id FROM ("
+            "  SELECT id, ROW_NUMBER() OVER ("
+            "   PARTITION BY original_path ORDER BY timestamp DESC, id DESC"
+            "  ) AS rn FROM backups" + where +
+            " ) WHERE rn = 1"
+            ") ORDER BY timestamp DESC"
+        )
+        return [dict(r) for r in conn.execute(query, params).fetchall()]
+
+    def count_backups(
+        self,
+        original_path: str | None = None,
+        process_name: str | None = None,
+        since: str | None = None,
+    ) -> int:
+        conn = self._get_connection()
+        where, params = self._backup_filters(original_path, process_name, since)
+        return conn.execute("SELECT COUNT(*) FROM backups" + where, params).fetchone()[0]
+
     def get_backup_by_id(self, backup_id: int) -> dict | None:
         conn = self._get_connection()
         row = conn.execute(
@@ -270,6 +537,69 @@ class SnapshotService:
         ).fetchone()
         return dict(row) if row else None
 
+    def get_backups_by_ids(self, backup_ids: list[int]) -> dict[int, dict]:
+        """Fetch several backup records at once, keyed by ID.
+
+        IDs with no record are simply absent from the result.
+        """
+        conn = self._get_connection()
+        ids = list(dict.fromkeys(backup_ids))
+        records: dict[int, dict] = {}
+        # Stay well under SQLite's bound-parameter limit
+        for start in range(0, len(ids), _MAX_IN_PARAMS):
+            chunk = ids[start:start + _MAX_IN_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT * FROM backups WHERE id IN ({placeholders})", chunk
+            ).fetchall()
+            for r in rows:
+                records[r["id"]] = dict(r)
+        return records
+
+    def get_latest_backups(self, original_paths: list[str]) -> dict[str, dict]:
+        """Fetch the newest backup record for each path, keyed by path.
+
+        Paths with no backup are simply absent from the result.
+        """
+        conn = self._get_connection()
+        paths = list(dict.fromkeys(original_paths))
+        latest: dict[str, dict] = {}
+        for start in range(0, len(paths), _MAX_IN_PARAMS):
+            chunk = paths[start:start + _MAX_IN_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT * FROM backups WHERE original_path IN ({placeholders})"
+                " ORDER BY timestamp, id",
+                chunk,
+            ).fetchall()
+            for r in rows:
+                latest[r["original_path"]] = dict(r)
+        return latest
+
+    def referenced_backup_paths(self, backup_paths: list[str]) -> set[str]:
+        """Those of ``backup_paths`` that some index row still points at."""
+        conn = self._get_connection()
+        paths = list(dict.fromkeys(backup_paths))
+        referenced: set[str] = set()
+        for start in range(0, len(paths), _MAX_IN_PARAMS):
+            chunk = paths[start:start + _MAX_IN_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT DISTINCT backup_path FROM backups"
+                f" WHERE backup_path IN ({placeholders})",
+                chunk,
+            ).fetchall()
+            referenced.update(r[0] for r in rows)
+        return referenced
+
+    def get_block_hashes(self, backup_path: str) -> bytes | None:
+        """Per-block digests stored for a backup, or None if it has none."""
+        row = self._get_connection().execute(
+            "SELECT block_hashes FROM backup_blocks WHERE backup_path = ?",
+            (backup_path,),
+        ).fetchone()
+        return row[0] if row else None
+
     # ------------------------------------------------------------------
     # Cleanup
     # ------------------------------------------------------------------
@@ -94,6 +94,19 @@ class TestFileSha256:
     def test_nonexistent_returns_none(self):
         assert file_sha256("/no/such/file") is None
 
+    def test_empty_file(self, source_dir):
+        p = source_dir / "empty.bin"
+        p.write_bytes(b"")
+        assert file_sha256(str(p)) == hashlib.sha256(b"").hexdigest()
+
+    def test_file_larger_than_one_chunk(self, source_dir, monkeypatch):
+        from src.response import snapshot_service
+        monkeypatch.setattr(snapshot_service, "HASH_CHUNK_SIZE", 1000)
+        data = os.urandom(4500)
+        p = source_dir / "chunks.bin"
+        p.write_bytes(data)
+        assert file_sha256(str(p)) == hashlib.sha256(data).hexdigest()
+
 
 # ---------------------------------------------------------------------------
 # Snapshot creation & metadata
@@ -158,6 +171,75 @@ class TestSnapshotCreation:
     def test_directory_skipped(self, snapshot_svc, source_dir):
         assert snapshot_svc.create_snapshot(str(source_dir)) is None
 
+    def test_batch_snapshot(self, snapshot_svc, source_dir):
+        paths = []
+        for i in range(5):
+            p = source_dir / f"batch{i}.txt"
+            p.write_text(f"content {i}")
+            paths.append(str(p))
+        results = snapshot_svc.create_snapshots(
+            paths[:2] + ["/no/such/file.txt"] + paths[2:], reason="burst",
+        )
+        assert results[2] is None
+        done = [r for r in results if r is not None]
+        assert [r["original_path"] for r in done] == paths
+        assert all(file_sha256(r["backup_path"]) == r["file_hash"] for r in done)
+        assert snapshot_svc.count_backups() == 5
+
+        meta_path = os.path.join(os.path.dirname(done[0]["backup_path"]), "metadata.json")
+        entries = json.loads(Path(meta_path).read_text())
+        assert {e["original_path"] for e in entries} == set(paths)
+
+    def test_backup_files_skips_duplicates_and_unchanged(self, backup_mgr, source_dir):
+        a = source_dir / "a.txt"
+        b = source_dir / "b.txt"
+        a.write_text("alpha")
+        b.write_text("beta")
+        first = backup_mgr.backup_files([str(a), str(b), str(a)], reason="l2")
+        assert first[0] == first[2]
+        assert backup_mgr.snapshot.count_backups() == 2
+
+        a.write_text("encrypted")
+        second = backup_mgr.backup_files([str(a), str(b)], reason="l3")
+        assert second[0]["backup_path"] != first[0]["backup_path"]
+        # Unchanged b gets a new index row pointing at its existing copy
+        assert second[1]["backup_path"] == first[1]["backup_path"]
+        assert second[1]["reason"] == "l3"
+        assert backup_mgr.snapshot.count_backups() == 4
+        vault_files = [p for p in Path(backup_mgr.snapshot.vault_path).rglob("*.txt*")]
+        assert len(vault_files) == 3
+
+    def test_unchanged_file_restorable_for_new_process(self, backup_mgr, source_dir):
+        f = source_dir / "doc.txt"
+        f.write_text("original")
+        backup_mgr.backup_files([str(f)], reason="routine")
+        backup_mgr.backup_files([str(f)], reason="l2", process_name="evil")
+
+        f.write_text("ENCRYPTED")
+        results = backup_mgr.recovery.restore_by_process("evil")
+        assert [r.success for r in results] == [True]
+        assert f.read_text() == "original"
+
+    def test_missing_vault_copy_backed_up_again(self, backup_mgr, source_dir):
+        f = source_dir / "doc.txt"
+        f.write_text("original")
+        first = backup_mgr.backup_files([str(f)])[0]
+        os.remove(first["backup_path"])
+
+        second = backup_mgr.backup_files([str(f)])[0]
+        assert backup_mgr.snapshot.count_backups() == 2
+        assert file_sha256(second["backup_path"]) == first["file_hash"]
+
+    def test_tampered_vault_copy_backed_up_again(self, backup_mgr, source_dir):
+        f = source_dir / "doc.txt"
+        f.write_text("original")
+        first = backup_mgr.backup_files([str(f)])[0]
+        Path(first["backup_path"]).write_text("tampered")
+
+        second = backup_mgr.backup_files([str(f)])[0]
+        assert second["backup_path"] != first["backup_path"]
+        assert file_sha256(second["backup_path"]) == first["file_hash"]
+
 
 # ---------------------------------------------------------------------------
 # Database schema (from docs)
@@ -266,6 +348,53 @@ class TestRecoveryIndividual:
         assert "not found" in result.error
 
 
+class TestRecoveryBatch:
+    def test_restore_files_in_input_order(self, backup_mgr, source_dir):
+        paths = [source_dir / f"batch_{i}.txt" for i in range(5)]
+        for i, p in enumerate(paths):
+            p.write_text(f"content {i}")
+            backup_mgr.backup_file(str(p))
+        ids = [backup_mgr.snapshot.get_backups(original_path=str(p))[0]["id"]
+               for p in paths]
+        for p in paths:
+            p.write_text("ENCRYPTED")
+
+        results = backup_mgr.recovery.restore_files(ids[::-1] + [99999])
+        assert [r.original_path for r in results[:5]] == [str(p) for p in paths[::-1]]
+        assert all(r.success and r.integrity_ok for r in results[:5])
+        assert results[5].success is False
+        assert "not found" in results[5].error
+        for i, p in enumerate(paths):
+            assert p.read_text() == f"content {i}"
+
+    def test_on_result_called_per_backup(self, backup_mgr, source_dir):
+        paths = [source_dir / f"progress_{i}.txt" for i in range(3)]
+        for p in paths:
+            p.write_text("data")
+            backup_mgr.backup_file(str(p))
+        ids = [backup_mgr.snapshot.get_backups(original_path=str(p))[0]["id"]
+               for p in paths]
+
+        seen = []
+        results = backup_mgr.recovery.restore_files(ids + [99999], on_result=seen.append)
+        assert len(seen) == 4
+        assert sorted(seen, key=id) == sorted(results, key=id)
+
+    def test_same_path_restored_in_order(self, backup_mgr, source_dir):
+        src = source_dir / "versioned.txt"
+        src.write_text("v1")
+        backup_mgr.backup_file(str(src))
+        time.sleep(0.05)
+        src.write_text("v2")
+        backup_mgr.backup_file(str(src))
+        newest, oldest = [b["id"] for b in
+                          backup_mgr.snapshot.get_backups(original_path=str(src))]
+
+        results = backup_mgr.recovery.restore_files([newest, oldest])
+        assert all(r.success for r in results)
+        assert src.read_text() == "v1"
+
+
 class TestRecoveryByPath:
     def test_latest_only(self, backup_mgr, source_dir):
         src = source_dir / "versioned.txt"
@@ -304,6 +433,19 @@ class TestRecoveryByProcess:
         assert a.read_text() == "file A"
         assert b.read_text() == "file B"
 
+    def test_restores_latest_version_once(self, backup_mgr, source_dir):
+        a = source_dir / "a.txt"
+        a.write_text("v1")
+        backup_mgr.backup_file(str(a), process_name="ransomware.exe")
+        time.sleep(0.05)
+        a.write_text("v2")
+        backup_mgr.backup_file(str(a), process_name="ransomware.exe")
+
+        a.write_text("ENCRYPTED")
+        results = backup_mgr.recovery.restore_by_process("ransomware.exe")
+        assert len(results) == 1
+        assert a.read_text() == "v2"
+
 
 class TestRecoveryPointInTime:
     def test_restore_since_timestamp(self, backup_mgr, source_dir):
@@ -320,6 +462,21 @@ class TestRecoveryPointInTime:
         assert any(r.success and r.original_path == str(f) for r in results)
         assert f.read_text() == "point-in-time"
 
+    def test_restores_many_files_in_parallel(self, backup_mgr, source_dir):
+        before = datetime.now().isoformat()
+        time.sleep(0.05)
+        files = [source_dir / f"pit{i}.txt" for i in range(12)]
+        for i, f in enumerate(files):
+            f.write_text(f"original {i}")
+        backup_mgr.backup_files([str(f) for f in files])
+
+        for f in files:
+            f.write_text("GONE")
+        results = backup_mgr.recovery.restore_point_in_time(before)
+        assert len(results) == len(files)
+        assert all(r.success for r in results)
+        assert [f.read_text() for f in files] == [f"original {i}" for i in range(12)]
+
 
 class TestIntegrityVerification:
     def test_verify_intact_backup(self, backup_mgr, source_dir):
@@ -360,6 +517,51 @@ class TestIntegrityVerification:
         # Original should NOT have been overwritten with tampered data
         assert src.read_text() == "destroyed"
 
+    def test_large_backup_verified_by_block(self, backup_mgr, source_dir, monkeypatch):
+        from src.response import snapshot_service
+        monkeypatch.setattr(snapshot_service, "VERIFY_BLOCK_SIZE", 1024)
+        data = os.urandom(3000)
+        src = source_dir / "large.bin"
+        src.write_bytes(data)
+        record = backup_mgr.backup_file(str(src))
+        assert record["file_hash"] == hashlib.sha256(data).hexdigest()
+
+        block_hashes = backup_mgr.snapshot.get_block_hashes(record["backup_path"])
+        assert block_hashes == b"".join(
+            hashlib.sha256(data[i:i + 1024]).digest() for i in range(0, 3000, 1024)
+        )
+        bid = backup_mgr.snapshot.get_backups(original_path=str(src))[0]["id"]
+        assert backup_mgr.recovery.verify_backup(bid) is True
+
+        with open(record["backup_path"], "r+b") as f:
+            f.seek(1500)
+            f.write(b"X")
+        assert backup_mgr.recovery.verify_backup(bid) is False
+
+    def test_restore_streams_and_verifies_blocks(self, backup_mgr, source_dir, monkeypatch):
+        from src.response import snapshot_service
+        monkeypatch.setattr(snapshot_service, "VERIFY_BLOCK_SIZE", 1024)
+        data = os.urandom(3000)
+        src = source_dir / "stream.bin"
+        src.write_bytes(data)
+        record = backup_mgr.backup_file(str(src))
+        bid = backup_mgr.snapshot.get_backups(original_path=str(src))[0]["id"]
+
+        src.write_bytes(b"encrypted")
+        result = backup_mgr.recovery.restore_file(bid)
+        assert result.success is True
+        assert result.integrity_ok is True
+        assert src.read_bytes() == data
+
+        with open(record["backup_path"], "r+b") as f:
+            f.seek(2500)
+            f.write(b"X")
+        src.write_bytes(b"encrypted")
+        result = backup_mgr.recovery.restore_file(bid)
+        assert result.integrity_ok is False
+        assert src.read_bytes() == b"encrypted"
+        assert sorted(os.listdir(source_dir)) == ["stream.bin"]
+
 
 # ---------------------------------------------------------------------------
 # 48-hour retention policy
@@ -392,6 +594,23 @@ class TestRetentionPolicy:
         assert len(mgr.snapshot.get_backups()) == 1
         mgr.close()
 
+    def test_shared_copy_kept_while_indexed(self, vault, source_dir):
+        mgr = BackupManager(vault_path=vault, retention_hours=48)
+        src = source_dir / "shared.txt"
+        src.write_text("same content")
+        old = mgr.snapshot.create_snapshot(
+            str(src), reason="old",
+            timestamp=datetime.now() - timedelta(hours=50),
+        )
+        mgr.backup_files([str(src)], reason="fresh")
+
+        mgr.enforce_retention()
+        backups = mgr.snapshot.get_backups()
+        assert [b["reason"] for b in backups] == ["fresh"]
+        assert os.path.isfile(old["backup_path"])
+        assert mgr.recovery.verify_backup(backups[0]["id"]) is True
+        mgr.close()
+
     def test_mixed_retention(self, vault, source_dir):
         mgr = BackupManager(vault_path=vault, retention_hours=48)
 
@@ -412,6 +631,23 @@ class TestRetentionPolicy:
         assert remaining[0]["original_path"] == str(fresh)
         mgr.close()
 
+    def test_expired_snapshot_dir_removed_live_dir_kept(self, vault, source_dir):
+        mgr = BackupManager(vault_path=vault, retention_hours=48)
+        old = source_dir / "old.txt"
+        old.write_text("old")
+        stale = mgr.snapshot.create_snapshot(
+            str(old), reason="old",
+            timestamp=datetime.now() - timedelta(hours=50),
+        )
+        fresh = source_dir / "fresh.txt"
+        fresh.write_text("fresh")
+        live = mgr.backup_file(str(fresh))
+
+        mgr.enforce_retention()
+        assert not os.path.exists(os.path.dirname(stale["backup_path"]))
+        assert os.path.isfile(live["backup_path"])
+        mgr.close()
+
 
 # ---------------------------------------------------------------------------
 # Performance
@@ -19,6 +19,7 @@ from src.analysis.pattern_detector import (
     PatternDetector,
     FileEvent,
     SUSPICIOUS_EXTENSIONS,
+    _is_temp_dir,
 )
 from src.analysis.threat_scoring import (
     calculate_threat_score,
@@ -67,6 +68,20 @@ def make_event(
     )
 
 
+class TestFileEvent:
+    def test_path_parts_derived_once(self):
+        ev = make_event(file_path="/home/u/docs/report.final.locked")
+        assert ev.parent_dir == "/home/u/docs"
+        assert ev.stem == "report.final"
+        assert ev.suffix == ".locked"
+
+    def test_extension_lower_cased(self):
+        ev = make_event(file_path="/w/REPORT.LOCKED", file_extension=".LOCKED")
+        assert ev.file_extension == ".locked"
+        assert ev.suffix == ".locked"
+        assert ev.stem == "REPORT"
+
+
 # ===================================================================
 # Pattern Detector: Individual Indicator Tests
 # ===================================================================
@@ -176,6 +191,15 @@ class TestIndicator4DirectoryTraversal:
         assert triggered is True
         assert "4" in detail
 
+    def test_stale_directories_forgotten(self):
+        pd = PatternDetector(time_window=1.0, directory_traversal_min_dirs=4)
+        old_ts = time.time() - 2.0
+        for i in range(4):
+            pd.record_event(make_event(file_path=f"/dir{i}/file.txt", timestamp=old_ts))
+        pd.record_event(make_event(file_path="/dir0/other.txt"))
+        assert pd.check_directory_traversal(1000)[0] is False
+        assert set(pd._trackers[1000].directories_touched) == {"/dir0"}
+
 
 class TestIndicator5SuspiciousProcess:
     def test_temp_dir_detected(self):
@@ -201,6 +225,21 @@ class TestIndicator5SuspiciousProcess:
         ))
         assert pd.check_suspicious_process(1000)[0] is False
 
+    def test_windows_temp_dir_detected(self):
+        assert _is_temp_dir("C:\\Users\\bob\\AppData\\Local\\Temp") is True
+        assert _is_temp_dir("C:\\Users\\bob\\Documents") is False
+
+    def test_marker_must_be_whole_component(self):
+        pd = PatternDetector()
+        pd.record_event(make_event(file_path="/home/user/Templates/letter.txt"))
+        assert pd.check_suspicious_process(1000)[0] is False
+
+    def test_temp_activity_ages_out(self):
+        pd = PatternDetector(time_window=1.0)
+        pd.record_event(make_event(file_path="/tmp/a.txt", timestamp=time.time() - 2.0))
+        pd.record_event(make_event(file_path="/home/user/Documents/b.txt"))
+        assert pd.check_suspicious_process(1000)[0] is False
+
 
 class TestIndicator6DeletionPattern:
     def test_delete_then_create_encrypted(self):
@@ -254,6 +293,22 @@ class TestTimeWindow:
         # All events are stale
         assert pd.check_mass_modification(1000)[0] is False
 
+    def test_running_counts_follow_window(self):
+        pd = PatternDetector(time_window=1.0, entropy_spike_min_files=1,
+                             extension_change_min_files=1)
+        old_ts = time.time() - 2.0
+        pd.record_event(make_event(entropy_delta=3.0, timestamp=old_ts))
+        pd.record_event(make_event(event_type="extension_changed",
+                                   file_extension=".locked", timestamp=old_ts))
+        pd.record_event(make_event(event_type="created", timestamp=old_ts))
+        tracker = pd._trackers[1000]
+        assert tracker.entropy_spike_count == 0
+        assert tracker.suspicious_rename_count == 0
+        assert not tracker.created_files
+        pd.record_event(make_event(entropy_delta=3.0))
+        assert pd.check_entropy_spike(1000)[0] is True
+        assert pd.check_extension_manipulation(1000)[0] is False
+
     def test_fresh_events_kept(self):
         pd = PatternDetector(time_window=10.0, mass_modify_threshold=5)
         for i in range(6):
@@ -345,6 +400,10 @@ class TestClassifyLevel:
         assert classify_level(71) == LEVEL_CRITICAL
         assert classify_level(100) == LEVEL_CRITICAL
 
+    def test_out_of_range_scores(self):
+        assert classify_level(-5) == LEVEL_NORMAL
+        assert classify_level(150) == LEVEL_CRITICAL
+
 
 class TestScoringWeights:
     """Verify the exact weights match the Phase 3 documentation."""
@@ -357,6 +416,19 @@ class TestScoringWeights:
         assert WEIGHT_SUSPICIOUS_PROCESS == 10
         assert WEIGHT_DELETION_PATTERN == 20
 
+    def test_every_combination_matches_weight_sum(self):
+        import itertools
+        names = list(INDICATOR_WEIGHTS)
+        for flags in itertools.product((False, True), repeat=len(names)):
+            results = {n: (f, "d") for n, f in zip(names, flags)}
+            expected = min(sum(INDICATOR_WEIGHTS[n] for n, f in zip(names, flags) if f), 100)
+            assert calculate_threat_score(results).score == expected
+
+    def test_unknown_indicator_reported_without_weight(self):
+        ts = calculate_threat_score({"custom_rule": (True, "detail")})
+        assert ts.score == 0
+        assert ts.triggered_indicators == {"custom_rule": "detail"}
+
 
 # ===================================================================
 # BehaviorAnalyzer (integration of detector + scoring)
@@ -374,6 +446,45 @@ class TestBehaviorAnalyzer:
         assert score.level == LEVEL_NORMAL
         assert score.action_required is False
 
+    def test_scores_version_changes_only_with_scores(self):
+        ba = BehaviorAnalyzer()
+        v0 = ba.scores_version
+        ba.process_event(event_type="modified", file_path="/w/a.txt",
+                         process_id=1, process_name="editor")
+        v1 = ba.scores_version
+        assert v1 != v0
+        ba.process_event(event_type="modified", file_path="/w/b.txt",
+                         process_id=1, process_name="editor")
+        assert ba.scores_version == v1
+
+    def test_score_dicts_match_scores(self):
+        ba = BehaviorAnalyzer()
+        ba.process_event(event_type="modified", file_path="/w/a.txt",
+                         process_id=1, process_name="editor")
+        ts = ba.get_score(1)
+        assert ba.get_all_score_dicts() == {
+            1: {"score": ts.score, "level": ts.level, "process_name": "editor"},
+        }
+
+    def test_count_by_level_tracks_level_changes(self):
+        ba = BehaviorAnalyzer(mass_modify_threshold=5, directory_traversal_min_dirs=3)
+        ba.process_event(event_type="modified", file_path="/w/a.txt",
+                         process_id=1, process_name="editor")
+        ba.process_event(event_type="modified", file_path="/w/b.txt",
+                         process_id=2, process_name="evil")
+        assert ba.count_by_level() == {LEVEL_NORMAL: 2}
+
+        for i in range(6):
+            ba.process_event(event_type="modified", file_path=f"/d{i}/f{i}.txt",
+                             process_id=2, process_name="evil")
+        counts = ba.count_by_level()
+        assert counts[LEVEL_NORMAL] == 1
+        assert sum(counts.values()) == 2
+        assert counts == {
+            level: sum(1 for s in ba.get_all_scores().values() if s.level == level)
+            for level in counts
+        }
+
     def test_mass_modify_plus_entropy_triggers_critical(self):
         ba = BehaviorAnalyzer(
             mass_modify_threshold=5,
@@ -454,6 +565,52 @@ class TestBehaviorAnalyzer:
         crits = ba.get_critical_processes()
         assert any(s.process_id == 50 for s in crits)
 
+    def test_async_evaluation_scores_on_worker(self):
+        alerts = []
+        ba = BehaviorAnalyzer(
+            mass_modify_threshold=2,
+            entropy_spike_min_files=2,
+            directory_traversal_min_dirs=2,
+            on_threat=lambda ts: alerts.append(ts),
+            async_evaluation=True,
+        )
+        try:
+            for i in range(4):
+                ba.process_event(
+                    event_type="modified",
+                    file_path=f"/tmp/dir{i}/f{i}.txt",
+                    process_id=50,
+                    process_name="badproc",
+                    entropy_delta=5.0,
+                )
+            deadline = time.time() + 2.0
+            while not alerts and time.time() < deadline:
+                time.sleep(0.01)
+            assert alerts and alerts[-1].process_id == 50
+            assert ba.get_score(50).action_required is True
+        finally:
+            ba.close()
+
+    def test_async_process_event_returns_none(self):
+        ba = BehaviorAnalyzer(async_evaluation=True)
+        try:
+            for _ in range(2):
+                assert ba.process_event(event_type="modified", file_path="/w/a.txt",
+                                        process_id=7, process_name="editor") is None
+                ba.flush()
+            assert ba.get_score(7) is not None
+        finally:
+            ba.close()
+
+    def test_async_close_scores_queued_events(self):
+        ba = BehaviorAnalyzer(async_evaluation=True, min_eval_interval=10.0)
+        ba.process_event(event_type="modified", file_path="/w/a.txt",
+                         process_id=7, process_name="editor")
+        ba.close()
+        score = ba.get_score(7)
+        assert score is not None
+        assert score.process_name == "editor"
+
 
 # ===================================================================
 # False positive scenarios
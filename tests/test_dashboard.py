@@ -19,6 +19,8 @@ Endpoints tested:
 
 import json
 import os
+import threading
+import time
 
 import pytest
 
@@ -89,6 +91,19 @@ def client(app):
         yield c
 
 
+# ---------------------------------------------------------------------------
+# JSON provider
+# ---------------------------------------------------------------------------
+
+class TestJsonProvider:
+    def test_orjson_provider_installed(self, app):
+        from src.dashboard.json_provider import OrjsonProvider, orjson
+        if orjson is None:
+            pytest.skip("orjson not installed")
+        assert isinstance(app.json, OrjsonProvider)
+        assert app.json.dumps({2: "b", "a": [1.5, None]}) == '{"2":"b","a":[1.5,null]}'
+
+
 # ---------------------------------------------------------------------------
 # GET /api/status
 # ---------------------------------------------------------------------------
@@ -122,6 +137,30 @@ class TestGetStatus:
         # Should be ELEVATED or NORMAL depending on score
         assert data["threat_level"] in ("NORMAL", "ELEVATED", "CRITICAL")
 
+    def test_status_body_reused_within_ttl(self, client, monkeypatch):
+        from src.dashboard.api import routes
+        monkeypatch.setattr(routes, "STATUS_TTL", 60)
+        first = client.get("/api/status").get_json()
+        second = client.get("/api/status").get_json()
+        assert first["timestamp"] == second["timestamp"]
+
+    def test_status_not_modified(self, client, monkeypatch):
+        from src.dashboard.api import routes
+        monkeypatch.setattr(routes, "STATUS_TTL", 60)
+        etag = client.get("/api/status").headers["ETag"]
+        resp = client.get("/api/status", headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+        assert resp.data == b""
+
+    def test_status_reflects_new_scores(self, client, services):
+        ba = services["behavior_analyzer"]
+        assert client.get("/api/status").get_json()["active_processes"] == {}
+
+        ba.process_event(event_type="modified", file_path="/f.txt",
+                         process_id=7, process_name="editor")
+        data = client.get("/api/status").get_json()
+        assert data["active_processes"]["7"]["process_name"] == "editor"
+
 
 # ---------------------------------------------------------------------------
 # GET /api/events
@@ -133,7 +172,8 @@ class TestGetEvents:
         assert resp.status_code == 200
         data = resp.get_json()
         assert data["events"] == []
-        assert data["total"] == 0
+        assert data["has_more"] is False
+        assert "total" not in data
 
     def test_events_returned(self, client, services):
         el = services["event_logger"]
@@ -141,8 +181,8 @@ class TestGetEvents:
         el.log_event(event_type="modified", file_path="/b.txt")
 
         data = client.get("/api/events").get_json()
-        assert data["total"] == 2
         assert len(data["events"]) == 2
+        assert data["has_more"] is False
 
     def test_filter_by_type(self, client, services):
         el = services["event_logger"]
@@ -162,6 +202,44 @@ class TestGetEvents:
         assert data["limit"] == 3
         assert data["offset"] == 0
 
+    def test_total_counts_all_matching_events(self, client, services):
+        el = services["event_logger"]
+        for i in range(10):
+            el.log_event(event_type="created", file_path=f"/f{i}.txt")
+        el.log_event(event_type="deleted", file_path="/gone.txt")
+
+        data = client.get(
+            "/api/events?type=created&limit=3&offset=6&include_total=1"
+        ).get_json()
+        assert len(data["events"]) == 3
+        assert data["total"] == 10
+        assert data["has_more"] is True
+
+    def test_offset_pages_do_not_overlap(self, client, services):
+        el = services["event_logger"]
+        for i in range(6):
+            el.log_event(event_type="created", file_path=f"/f{i}.txt")
+
+        first = client.get("/api/events?limit=3&offset=0").get_json()["events"]
+        second = client.get("/api/events?limit=3&offset=3").get_json()["events"]
+        ids = {e["id"] for e in first} | {e["id"] for e in second}
+        assert len(ids) == 6
+
+    def test_cursor_pagination(self, client, services):
+        el = services["event_logger"]
+        for i in range(5):
+            el.log_event(event_type="created", file_path=f"/f{i}.txt")
+
+        seen = []
+        url = "/api/events?limit=2"
+        while True:
+            data = client.get(url).get_json()
+            seen += [e["file_path"] for e in data["events"]]
+            if data["next_cursor"] is None:
+                break
+            url = f"/api/events?limit=2&cursor={data['next_cursor']}"
+        assert seen == [f"/f{i}.txt" for i in reversed(range(5))]
+
 
 # ---------------------------------------------------------------------------
 # GET /api/threats
@@ -191,6 +269,35 @@ class TestGetThreats:
         data = client.get("/api/threats?severity=2").get_json()
         assert all(t["escalation_level"] == 2 for t in data["threats"])
 
+    def test_newest_first_with_limit(self, client, services):
+        re = services["response_engine"]
+        for score in (35, 40, 45):
+            re.respond(ThreatScore(1, "a", score, "SUSPICIOUS", {"t": "d"}, False))
+        re.respond(ThreatScore(1, "a", 10, "NORMAL", {}, False))
+
+        data = client.get("/api/threats?limit=2").get_json()
+        assert [t["score"] for t in data["threats"]] == [45, 40]
+
+    def test_since_filter(self, client, services):
+        re = services["response_engine"]
+        re.respond(ThreatScore(1, "a", 40, "SUSPICIOUS", {"t": "d"}, False))
+        cutoff = re.response_log[-1].timestamp
+        re.respond(ThreatScore(2, "b", 60, "LIKELY", {"t": "d"}, False))
+
+        data = client.get(f"/api/threats?since={cutoff}").get_json()
+        assert [t["process_id"] for t in data["threats"]] == [2, 1]
+
+        later = re.response_log[-1].timestamp + "Z"
+        data = client.get(f"/api/threats?since={later}").get_json()
+        assert data["threats"] == []
+
+    def test_non_numeric_severity(self, client, services):
+        re = services["response_engine"]
+        re.respond(ThreatScore(1, "a", 40, "SUSPICIOUS", {"t": "d"}, False))
+
+        data = client.get("/api/threats?severity=high").get_json()
+        assert data["threats"] == []
+
 
 # ---------------------------------------------------------------------------
 # POST /api/quarantine
@@ -241,6 +348,22 @@ class TestGetBackups:
         data = client.get("/api/backups?process=alpha").get_json()
         assert all(b["process_name"] == "alpha" for b in data["backups"])
 
+    def test_has_more_and_total(self, client, services):
+        bm = services["backup_manager"]
+        for i in range(3):
+            src = services["tmp_path"] / f"b{i}.txt"
+            src.write_text("data")
+            bm.backup_file(str(src))
+
+        data = client.get("/api/backups?limit=2").get_json()
+        assert len(data["backups"]) == 2
+        assert data["has_more"] is True
+        assert "total" not in data
+
+        data = client.get("/api/backups?limit=3&include_total=1").get_json()
+        assert data["has_more"] is False
+        assert data["total"] == 3
+
 
 # ---------------------------------------------------------------------------
 # POST /api/restore
@@ -305,6 +428,16 @@ class TestGetConfig:
         data = resp.get_json()
         assert "monitor" in data or "database" in data
 
+    def test_config_not_modified_until_changed(self, client):
+        etag = client.get("/api/config").headers["ETag"]
+        resp = client.get("/api/config", headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+
+        client.put("/api/config", json={"logging": {"level": "DEBUG"}})
+        resp = client.get("/api/config", headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+        assert resp.get_json()["logging"]["level"] == "DEBUG"
+
 
 # ---------------------------------------------------------------------------
 # PUT /api/config
@@ -337,6 +470,56 @@ class TestPutConfig:
         assert data["monitor"]["recursive"] is True
         assert data["monitor"]["watch_directories"] == ["/new"]
 
+    def test_unchanged_config_not_rewritten(self, client, services):
+        client.put("/api/config", json={"logging": {"level": "DEBUG"}})
+        with open(services["config_path"], "w") as f:
+            f.write("sentinel")
+
+        resp = client.put("/api/config", json={"logging": {"level": "DEBUG"}})
+        assert resp.status_code == 200
+        assert resp.get_json()["logging"]["level"] == "DEBUG"
+        with open(services["config_path"]) as f:
+            assert f.read() == "sentinel"
+
+    def test_config_write_leaves_no_temp_files(self, client, services):
+        client.put("/api/config", json={"logging": {"level": "WARNING"}})
+        config_dir = os.path.dirname(services["config_path"])
+        assert not [n for n in os.listdir(config_dir) if n.endswith(".tmp")]
+        with open(services["config_path"]) as f:
+            assert json.load(f)["logging"]["level"] == "WARNING"
+
+    def test_config_write_keeps_file_mode(self, client, services):
+        os.chmod(services["config_path"], 0o644)
+        client.put("/api/config", json={"logging": {"level": "WARNING"}})
+        assert os.stat(services["config_path"]).st_mode & 0o777 == 0o644
+
+    def test_noop_update_then_reads(self, client):
+        client.put("/api/config", json={"logging": {"level": "DEBUG"}})
+        resp = client.put("/api/config", json={"logging": {"level": "DEBUG"}})
+        assert resp.status_code == 200
+        assert client.get("/api/config").get_json()["logging"]["level"] == "DEBUG"
+
+        resp = client.put("/api/config", json={"logging": {"level": "INFO"}})
+        assert resp.get_json()["logging"]["level"] == "INFO"
+        assert client.get("/api/config").get_json()["logging"]["level"] == "INFO"
+
+    def test_update_broadcasts_only_changes(self, client, app, monkeypatch):
+        sent = []
+        monkeypatch.setattr(app.ws_handler, "broadcast",
+                            lambda event_type, data, **kw: sent.append((event_type, data)))
+        client.put("/api/config", json={"logging": {"level": "DEBUG"},
+                                        "monitor": {"recursive": True}})
+        assert sent == [("config_updated", {
+            "changed": ["logging.level"],
+            "values": {"logging.level": "DEBUG"},
+        })]
+
+    def test_type_change_applied(self, client):
+        client.put("/api/config", json={"entropy": {"delta_threshold": 1}})
+        client.put("/api/config", json={"entropy": {"delta_threshold": True}})
+        data = client.get("/api/config").get_json()
+        assert data["entropy"]["delta_threshold"] is True
+
 
 # ---------------------------------------------------------------------------
 # WebSocket handler unit tests
@@ -373,6 +556,22 @@ class TestWebSocketHandler:
         assert received[0]["type"] == "test_event"
         assert received[0]["data"]["key"] == "value"
 
+    def test_broadcast_sends_one_shared_text_message(self):
+        wsh = WebSocketHandler()
+        sent = []
+
+        class FakeWS:
+            def send(self, msg):
+                sent.append(msg)
+
+        wsh.register(FakeWS())
+        wsh.register(FakeWS())
+        wsh.broadcast("file_event", {"pid": 1})
+
+        assert isinstance(sent[0], str)
+        assert sent[0] is sent[1]
+        assert json.loads(sent[0]) == {"type": "file_event", "data": {"pid": 1}}
+
     def test_dead_client_removed(self):
         wsh = WebSocketHandler()
 
@@ -393,3 +592,80 @@ class TestWebSocketHandler:
 
         wsh.unregister(FakeWS())  # should not raise
         assert wsh.client_count == 0
+
+    def test_queued_broadcast_delivers(self):
+        wsh = WebSocketHandler(queued=True)
+        received = []
+        done = threading.Event()
+
+        class FakeWS:
+            def send(self, msg):
+                received.append(json.loads(msg))
+                if len(received) == 2:
+                    done.set()
+
+        ws = FakeWS()
+        wsh.register(ws)
+        wsh.broadcast("a", {})
+        wsh.broadcast("b", {})
+        assert done.wait(2)
+        assert [m["type"] for m in received] == ["a", "b"]
+        wsh.unregister(ws)
+        assert wsh.client_count == 0
+
+    def test_queued_slow_client_drops_instead_of_blocking(self):
+        wsh = WebSocketHandler(queued=True, queue_size=1)
+        release = threading.Event()
+        received = []
+
+        class SlowWS:
+            def send(self, msg):
+                release.wait(2)
+                received.append(msg)
+
+        wsh.register(SlowWS())
+        for i in range(5):
+            wsh.broadcast("tick", {"i": i})  # must not block
+        release.set()
+        deadline = time.monotonic() + 2
+        while len(received) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert 1 <= len(received) <= 2
+
+    def test_backlog_over_floor_skips_non_critical(self):
+        wsh = WebSocketHandler(queued=True, broadcast_floor=1)
+        release = threading.Event()
+        received = []
+
+        class SlowWS:
+            def send(self, msg):
+                release.wait(2)
+                received.append(json.loads(msg)["type"])
+
+        wsh.register(SlowWS())
+        wsh.broadcast("tick", {})
+        wsh.broadcast("tick", {})
+        wsh.broadcast("restore", {}, critical=True)
+        assert wsh.broadcasts_skipped == 1
+        release.set()
+        deadline = time.monotonic() + 2
+        while len(received) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert received == ["tick", "restore"]
+        while wsh.queued_bytes() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert wsh.queued_bytes() == 0
+
+    def test_queued_dead_client_removed(self):
+        wsh = WebSocketHandler(queued=True)
+
+        class DeadWS:
+            def send(self, msg):
+                raise ConnectionError("gone")
+
+        wsh.register(DeadWS())
+        wsh.broadcast("ping", {})
+        deadline = time.monotonic() + 2
+        while wsh.client_count and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert wsh.client_count == 0
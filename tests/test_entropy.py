@@ -20,6 +20,8 @@ import pytest
 from src.analysis.entropy_analyzer import (
     shannon_entropy,
     calculate_file_entropy,
+    file_entropy_and_size,
+    _numpy_entropy,
     _sample_offsets,
     DEFAULT_SAMPLE_SIZE,
     LARGE_FILE_THRESHOLD,
@@ -68,6 +70,11 @@ class TestShannonEntropy:
         entropy = shannon_entropy(data)
         assert entropy < 2.0
 
+    def test_matches_numpy_implementation(self):
+        # The optional numba kernel must agree with the NumPy fallback
+        for data in (os.urandom(1027), b"hello world" * 50, bytes(range(256)), b"\x07"):
+            assert abs(shannon_entropy(data) - _numpy_entropy(data)) < 1e-9
+
 
 # ---------------------------------------------------------------------------
 # File entropy calculation
@@ -82,6 +89,16 @@ class TestCalculateFileEntropy:
     def test_nonexistent_file(self):
         assert calculate_file_entropy("/no/such/file.bin") is None
 
+    def test_directory_returns_none(self, tmp_path):
+        assert calculate_file_entropy(str(tmp_path)) is None
+
+    def test_low_entropy_header_does_not_mask_payload(self, tmp_path):
+        # Ransomware can keep a plain header in front of encrypted data; the
+        # whole sample must be scored, not just a short prefix.
+        p = tmp_path / "padded.bin"
+        p.write_bytes(b"\x00" * 64 + os.urandom(DEFAULT_SAMPLE_SIZE - 64))
+        assert calculate_file_entropy(str(p)) > 7.0
+
     def test_text_file_low_entropy(self, tmp_path):
         # Plain English text: entropy ~4-5 bits/byte
         text = ("The quick brown fox jumps over the lazy dog. " * 50).encode()
@@ -107,6 +124,12 @@ class TestCalculateFileEntropy:
         ent_1024 = calculate_file_entropy(str(p), sample_size=1024)
         assert ent_256 > ent_1024
 
+    def test_entropy_and_size_from_one_open(self, tmp_path):
+        p = tmp_path / "sized.bin"
+        p.write_bytes(b"A" * 5000)
+        assert file_entropy_and_size(str(p)) == (0.0, 5000)
+        assert file_entropy_and_size("/no/such/file.bin") == (None, None)
+
 
 # ---------------------------------------------------------------------------
 # Various file type benchmarks (docs requirement: .txt, .docx, .pdf, .jpg, .zip)
@@ -218,7 +241,7 @@ class TestLargeFileSampling:
 
         entropy = calculate_file_entropy(str(p))
         assert entropy is not None
-        # Average of low and high entropy samples
+        # Combined distribution of low and high entropy samples
         assert 2.0 <= entropy <= 6.0
 
     def test_performance_large_file(self, tmp_path):
@@ -271,6 +294,64 @@ class TestEntropyBaseline:
         assert len(suspicious) == 1
         assert suspicious[0]["file_path"] == "/f.txt"
 
+    def test_writes_buffered_until_flush(self, baseline):
+        import sqlite3
+        baseline.set_baseline("/f.txt", 4.0)
+        alert_id = baseline.log_alert("/f.txt", None, 4.0, 0.0, False)
+        # Visible through the API before the writer thread commits
+        assert baseline.get_baseline("/f.txt") == 4.0
+        baseline.flush()
+        conn = sqlite3.connect(str(baseline.db_path))
+        row = conn.execute(
+            "SELECT entropy FROM entropy_baselines WHERE file_path = ?", ("/f.txt",)
+        ).fetchone()
+        alert = conn.execute(
+            "SELECT file_path FROM entropy_alerts WHERE id = ?", (alert_id,)
+        ).fetchone()
+        conn.close()
+        assert row == (4.0,)
+        assert alert == ("/f.txt",)
+
+    def test_failed_flush_rolls_back_and_requeues(self, tmp_path):
+        import sqlite3
+        db = str(tmp_path / "shared.db")
+        a = EntropyBaseline(db)
+        b = EntropyBaseline(db)
+        # Both preallocate alert id 1, so b's batch fails on insert
+        a.log_alert("/x", None, 1.0, 0.0, False)
+        b.set_baseline("/y", 4.0)
+        b.log_alert("/y", None, 4.0, 0.0, False)
+        a.flush()
+        with pytest.raises(sqlite3.IntegrityError):
+            b.flush()
+
+        assert not b._get_connection().in_transaction
+        assert b.get_baseline("/y") == 4.0
+        conn = sqlite3.connect(db)
+        assert conn.execute(
+            "SELECT 1 FROM entropy_baselines WHERE file_path = '/y'"
+        ).fetchone() is None
+
+        # Once the conflict is gone the requeued batch commits
+        conn.execute("DELETE FROM entropy_alerts")
+        conn.commit()
+        b.flush()
+        assert conn.execute(
+            "SELECT entropy FROM entropy_baselines WHERE file_path = '/y'"
+        ).fetchone() == (4.0,)
+        conn.close()
+        a.close()
+        b.close()
+
+    def test_close_flushes_pending_writes(self, tmp_path):
+        db = str(tmp_path / "closing.db")
+        bl = EntropyBaseline(db)
+        bl.set_baseline("/f.txt", 5.0)
+        bl.close()
+        reopened = EntropyBaseline(db)
+        assert reopened.get_baseline("/f.txt") == 5.0
+        reopened.close()
+
 
 # ---------------------------------------------------------------------------
 # Entropy detector (change detection)
@@ -289,6 +370,26 @@ class TestEntropyDetector:
         result = detector.analyze_file(str(p))
         assert result is not None
         assert result["suspicious"] is False
+        assert result["file_size"] == p.stat().st_size
+
+    def test_empty_file_keeps_baseline(self, detector, tmp_path):
+        p = tmp_path / "saved.txt"
+        p.write_text("Meeting notes from today.\n" * 50)
+        before = detector.on_file_created(str(p))["entropy_after"]
+        # A save truncates before writing; the empty file is not a baseline
+        p.write_bytes(b"")
+        assert detector.analyze_file(str(p))["suspicious"] is False
+        assert detector.baseline.get_baseline(str(p)) == before
+        p.write_text("Meeting notes from today.\nAction items.\n" * 50)
+        assert detector.analyze_file(str(p))["entropy_before"] == before
+
+    def test_normal_change_not_logged_as_alert(self, detector, tmp_path):
+        p = tmp_path / "normal.txt"
+        p.write_text("Just some normal text content here.\n" * 50)
+        detector.analyze_file(str(p))
+        p.write_text("Slightly edited normal text content.\n" * 50)
+        detector.analyze_file(str(p))
+        assert detector.baseline.get_alerts() == []
 
     def test_detect_encryption_spike(self, detector, tmp_path):
         p = tmp_path / "victim.txt"
@@ -340,6 +441,22 @@ class TestEntropyDetector:
         # Value should be in the in-memory cache
         assert str(p) in detector._cache
 
+    def test_cache_evicts_least_recently_used(self, tmp_path):
+        det = EntropyDetector(str(tmp_path / "lru.db"), cache_size=2)
+        paths = []
+        for name in ("a.txt", "b.txt", "c.txt"):
+            p = tmp_path / name
+            p.write_text("content\n" * 20)
+            paths.append(str(p))
+        det.on_file_created(paths[0])
+        det.on_file_created(paths[1])
+        det.analyze_file(paths[0])  # refresh a.txt
+        det.on_file_created(paths[2])
+        assert list(det._cache) == [paths[0], paths[2]]
+        # Evicted entries still fall back to the stored baseline
+        assert det.analyze_file(paths[1])["entropy_before"] is not None
+        det.close()
+
     def test_gradual_increase_below_threshold(self, detector, tmp_path):
         p = tmp_path / "slow.txt"
         p.write_text("a" * 500 + "b" * 500)
@@ -60,10 +60,16 @@ class TestDatabaseInit:
         assert "idx_events_path" in index_names
         assert "idx_events_process" in index_names
 
+    def test_connection_pragmas(self, logger):
+        conn = logger._get_connection()
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -64000
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+
 
 class TestLogEvent:
     def test_log_created_event(self, logger):
-        row_id = logger.log_event(
+        logger.log_event(
             event_type="created",
             file_path="/tmp/test.txt",
             file_extension=".txt",
@@ -71,9 +77,9 @@ class TestLogEvent:
             process_id=1234,
             process_name="python",
         )
-        assert row_id == 1
         events = logger.get_events(limit=1)
         assert len(events) == 1
+        assert events[0]["id"] == 1
         assert events[0]["event_type"] == "created"
         assert events[0]["file_path"] == "/tmp/test.txt"
 
@@ -147,6 +153,72 @@ class TestLogEvent:
         assert e["process_name"] is None
 
 
+class TestLogEvents:
+    def test_batch_insert(self, logger):
+        count = logger.log_events([
+            {"event_type": "created", "file_path": "/tmp/a.txt", "process_id": 7},
+            {"event_type": "deleted", "file_path": "/tmp/b.txt", "is_directory": True},
+        ])
+        assert count == 2
+        events = logger.get_events()
+        assert [e["file_path"] for e in events] == ["/tmp/b.txt", "/tmp/a.txt"]
+        assert events[0]["is_directory"] == 1
+        assert events[1]["process_id"] == 7
+        assert events[1]["old_path"] is None
+
+    def test_batch_keeps_event_timestamps(self, logger):
+        logger.log_events([
+            {"event_type": "created", "file_path": "/a",
+             "timestamp": "2024-01-01T00:00:00"},
+            {"event_type": "created", "file_path": "/b"},
+        ])
+        by_path = {e["file_path"]: e["timestamp"] for e in logger.get_events()}
+        assert by_path["/a"] == "2024-01-01T00:00:00"
+        assert by_path["/b"] > "2024-01-01T00:00:00"
+
+    def test_empty_batch(self, logger):
+        assert logger.log_events([]) == 0
+        assert logger.get_events() == []
+
+
+class TestBufferedWrites:
+    def test_events_committed_in_background(self, logger, db_path):
+        import sqlite3
+        import time
+        logger.log_event(event_type="created", file_path="/a")
+        conn = sqlite3.connect(db_path)
+        deadline = time.monotonic() + 5
+        count = 0
+        while count == 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
+            count = conn.execute("SELECT COUNT(*) FROM file_events").fetchone()[0]
+        conn.close()
+        assert count == 1
+
+    def test_inserts_run_on_writer_thread(self, logger, monkeypatch):
+        writers = []
+        write_pending = logger._write_pending
+
+        def record():
+            writers.append(threading.current_thread().name)
+            write_pending()
+
+        monkeypatch.setattr(logger, "_write_pending", record)
+        logger.log_event(event_type="created", file_path="/a")
+        logger.flush()
+        assert logger.count_events() == 1
+        assert set(writers) == {"event-logger-writer"}
+
+    def test_close_flushes_pending_events(self, db_path):
+        el = EventLogger(db_path)
+        el.log_events([{"event_type": "created", "file_path": f"/f{i}"}
+                       for i in range(3)])
+        el.close()
+        check = EventLogger(db_path)
+        assert check.count_events() == 3
+        check.close()
+
+
 class TestGetEvents:
     def test_filter_by_event_type(self, logger):
         logger.log_event(event_type="created", file_path="/a")
@@ -198,6 +270,7 @@ class TestThreadSafety:
             t.start()
         for t in threads:
             t.join()
+        el.flush()
 
         el_check = EventLogger(db_path)
         events = el_check.get_events(limit=200)
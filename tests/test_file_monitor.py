@@ -77,6 +77,7 @@ def monitored_dir(test_dirs, event_logger):
 
     observer.stop()
     observer.join()
+    handler.close()
 
 
 def wait_for_events(event_logger, expected_type=None, min_count=1, timeout=3.0):
@@ -114,8 +115,12 @@ class TestFileCreation:
 
     def test_captures_file_size(self, monitored_dir):
         content = b"x" * 256
+        # Write outside the watched tree and link the finished file in, so
+        # the handler can't stat it between creation and the write
+        staged = monitored_dir["dirs"]["root"] / "sized.bin"
+        staged.write_bytes(content)
         path = monitored_dir["dirs"]["watched"] / "sized.bin"
-        path.write_bytes(content)
+        os.link(staged, path)
 
         events = wait_for_events(monitored_dir["logger"], "created")
         matching = [e for e in events if "sized.bin" in e["file_path"]]
@@ -253,6 +258,50 @@ class TestProcessAttribution:
         assert pid is None or isinstance(pid, int)
         assert name is None or isinstance(name, str)
 
+    def test_get_process_info_heuristic_cached(self, monkeypatch):
+        from src.monitor import file_monitor
+        scans = []
+        monkeypatch.setattr(file_monitor, "_proc_cache", None)
+        monkeypatch.setattr(file_monitor, "PROCESS_CACHE_TTL", 60)
+        monkeypatch.setattr(file_monitor, "_HAVE_PROCFS", False)
+        monkeypatch.setattr(file_monitor.psutil, "process_iter",
+                            lambda attrs: scans.append(attrs) or iter(()))
+        assert get_process_info() == (None, None)
+        assert get_process_info() == (None, None)
+        assert len(scans) == 1
+
+    def test_procfs_scan_picks_top_writer(self, tmp_path, monkeypatch):
+        from src.monitor import file_monitor
+
+        def fake_proc(pid, io=None, comm=None):
+            d = tmp_path / str(pid)
+            d.mkdir()
+            if io is not None:
+                (d / "io").write_bytes(io)
+            if comm is not None:
+                (d / "comm").write_bytes(comm)
+
+        def io_text(write_bytes):
+            return (b"rchar: 1\nwchar: 2\nread_bytes: 3\n"
+                    b"write_bytes: %d\ncancelled_write_bytes: 0\n" % write_bytes)
+
+        fake_proc(10, io_text(100), b"small\n")
+        fake_proc(20, io_text(5000), b"writer\n")
+        fake_proc(30, b"rchar: 1\n", b"no-counter\n")
+        fake_proc(40, comm=b"unreadable\n")
+        fake_proc(os.getpid(), io_text(10**9), b"self\n")
+        (tmp_path / "self").mkdir()
+        monkeypatch.setattr(file_monitor, "_PROC_ROOT", str(tmp_path))
+
+        assert file_monitor._top_writer_procfs() == (20, "writer")
+
+    def test_procfs_scan_without_writers(self, tmp_path, monkeypatch):
+        from src.monitor import file_monitor
+        (tmp_path / "10").mkdir()
+        (tmp_path / "10" / "io").write_bytes(b"rchar: 1\nwrite_bytes: 0\n")
+        monkeypatch.setattr(file_monitor, "_PROC_ROOT", str(tmp_path))
+        assert file_monitor._top_writer_procfs() == (None, None)
+
     def test_events_have_process_fields(self, monitored_dir):
         path = monitored_dir["dirs"]["watched"] / "proc_test.txt"
         path.write_text("process check")
@@ -291,6 +340,78 @@ class TestExcludeDirectories:
         observer.stop()
         observer.join()
 
+    def test_excluded_strings_match_anywhere_in_path(self, event_logger):
+        handler = RansomwareEventHandler(
+            event_logger=event_logger,
+            exclude_dirs=["/proc", "__pycache__", ".git"],
+        )
+        assert handler._is_excluded("/proc/1/status")
+        assert handler._is_excluded("/home/u/app/__pycache__/m.pyc")
+        assert handler._is_excluded("/home/u/repo/.git/index")
+        assert not handler._is_excluded("/home/u/docs/report.txt")
+
+    def test_no_excludes(self, event_logger):
+        handler = RansomwareEventHandler(event_logger=event_logger)
+        assert not handler._is_excluded("/anything")
+
+    def test_dispatch_drops_excluded_and_unhandled_events(
+        self, test_dirs, event_logger, monkeypatch
+    ):
+        from watchdog.events import FileCreatedEvent, FileMovedEvent, FileOpenedEvent
+        handler = RansomwareEventHandler(
+            event_logger=event_logger,
+            exclude_dirs=[str(test_dirs["excluded"])],
+        )
+        seen = []
+        for name in ("on_created", "on_modified", "on_moved"):
+            monkeypatch.setattr(handler, name, seen.append)
+        hidden = str(test_dirs["excluded"] / "a.txt")
+        shown = str(test_dirs["watched"] / "b.txt")
+
+        handler.dispatch(FileCreatedEvent(hidden))
+        handler.dispatch(FileOpenedEvent(shown))
+        handler.dispatch(FileCreatedEvent(shown))
+        handler.dispatch(FileMovedEvent(hidden, shown))
+        assert [type(e).__name__ for e in seen] == ["FileCreatedEvent", "FileMovedEvent"]
+
+
+class TestSizeCache:
+    def test_size_cache_evicts_least_recently_used(self, event_logger):
+        handler = RansomwareEventHandler(event_logger=event_logger, size_cache_size=2)
+        handler._size_put("/a", 1)
+        handler._size_put("/b", 2)
+        handler._size_put("/a", 3)
+        handler._size_put("/c", 4)
+        assert list(handler._size_cache) == ["/a", "/c"]
+
+
+class TestModifyDebounce:
+    def test_burst_is_coalesced(self, test_dirs, event_logger):
+        from watchdog.events import FileModifiedEvent
+        handler = RansomwareEventHandler(event_logger=event_logger, modify_debounce=5)
+        path = test_dirs["watched"] / "burst.txt"
+        for i in range(10):
+            path.write_text("x" * (i + 1))
+            handler.on_modified(FileModifiedEvent(str(path)))
+
+        # The first write is handled at once, the rest wait for the window
+        assert event_logger.count_events(event_type="modified") == 1
+        handler.close()
+        events = event_logger.get_events(event_type="modified")
+        assert [e["file_size_after"] for e in events] == [10, 1]
+
+    def test_delete_drops_deferred_modify(self, test_dirs, event_logger):
+        from watchdog.events import FileDeletedEvent, FileModifiedEvent
+        handler = RansomwareEventHandler(event_logger=event_logger, modify_debounce=5)
+        path = test_dirs["watched"] / "gone.txt"
+        path.write_text("data")
+        handler.on_modified(FileModifiedEvent(str(path)))
+        handler.on_modified(FileModifiedEvent(str(path)))
+        path.unlink()
+        handler.on_deleted(FileDeletedEvent(str(path)))
+        handler.close()
+        assert event_logger.count_events(event_type="modified") == 1
+
 
 class TestExtensionFilter:
     def test_only_matching_extensions_logged(self, test_dirs, event_logger):
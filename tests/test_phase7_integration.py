@@ -443,7 +443,7 @@ class TestDashboardIntegration:
 
         with app.test_client() as c:
             # Events endpoint
-            evts = c.get("/api/events").get_json()
+            evts = c.get("/api/events?include_total=1").get_json()
             assert evts["total"] >= 1
 
             # Threats endpoint
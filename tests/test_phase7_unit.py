@@ -560,8 +560,7 @@ class TestBehaviorAnalyzer:
 class TestEventLogger:
     def test_log_and_retrieve(self, tmp_path):
         el = EventLogger(str(tmp_path / "ev.db"))
-        rid = el.log_event(event_type="created", file_path="/a.txt")
-        assert rid > 0
+        el.log_event(event_type="created", file_path="/a.txt")
         events = el.get_events()
         assert len(events) == 1
         assert events[0]["event_type"] == "created"
@@ -933,6 +932,13 @@ class TestRecoveryWorkflowUnit:
         assert d["process_id"] == 1
         assert d["affected_files"] == ["/a.txt"]
 
+    def test_incident_report_json_same_without_orjson(self, monkeypatch):
+        import src.response.recovery_workflow as rw
+        ir = IncidentReport("2025-01-01", 1, "p", 80, {"a": "b"}, ["/a.txt"], ["killed"])
+        fast = ir.to_json()
+        monkeypatch.setattr(rw, "orjson", None)
+        assert ir.to_json() == fast
+
     def test_incidents_list(self, tmp_path):
         bm = BackupManager(str(tmp_path / "vault"))
         wf = RecoveryWorkflow(bm)
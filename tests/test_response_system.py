@@ -240,6 +240,19 @@ class TestLevel4Terminate:
         assert result.incident_report is not None
         assert result.incident_report.threat_score == 90
 
+    def test_incident_report_lists_rolled_back_files(self, engine, backup_mgr,
+                                                     source_dir, monkeypatch):
+        f = source_dir / "rollback.txt"
+        f.write_text("original")
+        backup_mgr.backup_file(str(f), process_name="ransomware")
+
+        def no_query(process_name):
+            raise AssertionError("affected files should come from the rollback")
+
+        monkeypatch.setattr(engine.workflow, "get_affected_files", no_query)
+        result = engine.respond(make_threat(90, pid=99999, name="ransomware"))
+        assert result.incident_report.affected_files == [str(f)]
+
     def test_sends_emergency_alert(self, engine):
         result = engine.respond(make_threat(95, pid=99999, name="fake"))
         emergencies = [a for a in result.alerts_sent if a.level == ALERT_EMERGENCY]
@@ -318,6 +331,12 @@ class TestAlertSystem:
         alerts.send(ALERT_WARNING, "T", "M")
         assert len(alerts.alert_log) == 2
 
+    def test_alert_log_keeps_most_recent(self):
+        alerts = AlertSystem(enable_desktop=False, log_size=3)
+        for i in range(5):
+            alerts.send(ALERT_INFO, f"T{i}", "M")
+        assert [a.title for a in alerts.alert_log] == ["T2", "T3", "T4"]
+
     def test_get_alerts_by_level(self):
         alerts = AlertSystem(enable_desktop=False)
         alerts.send(ALERT_INFO, "T", "M")
@@ -335,6 +354,46 @@ class TestAlertSystem:
         assert a.score == 80
         assert a.timestamp is not None
 
+    def test_linux_notify_uses_dbus_connection(self, monkeypatch):
+        from src.response import alert_system
+        sent, popen = [], []
+
+        class FakeConnection:
+            def send(self, msg):
+                sent.append(msg)
+
+        monkeypatch.setattr(alert_system, "open_dbus_connection",
+                            lambda bus: FakeConnection())
+        monkeypatch.setattr(alert_system, "new_method_call",
+                            lambda addr, method, sig, body: body, raising=False)
+        monkeypatch.setattr(alert_system, "_NOTIFICATIONS", None, raising=False)
+        monkeypatch.setattr(alert_system.subprocess, "Popen",
+                            lambda *a, **kw: popen.append(a))
+        alerts = AlertSystem()
+        alerts._system = "Linux"
+        assert alerts.send(ALERT_CRITICAL, "T", "M").delivered
+        assert sent[0][3:5] == ("T", "M")
+        assert sent[0][6] == {"urgency": ("y", 2)}
+        assert popen == []
+
+    def test_linux_notify_falls_back_without_dbus(self, monkeypatch):
+        from src.response import alert_system
+        opens, popen = [], []
+
+        def no_bus(bus):
+            opens.append(bus)
+            raise OSError("no session bus")
+
+        monkeypatch.setattr(alert_system, "open_dbus_connection", no_bus)
+        monkeypatch.setattr(alert_system.subprocess, "Popen",
+                            lambda *a, **kw: popen.append(a))
+        alerts = AlertSystem()
+        alerts._system = "Linux"
+        alerts.send(ALERT_INFO, "T", "M")
+        alerts.send(ALERT_INFO, "T", "M")
+        assert len(opens) == 1
+        assert len(popen) == 2
+
 
 # ---------------------------------------------------------------------------
 # Process controller
@@ -347,6 +406,12 @@ class TestProcessController:
         assert len(pc.action_log) == 1
         assert pc.action_log[0].success is False
 
+    def test_action_log_keeps_most_recent(self):
+        pc = ProcessController(log_size=2)
+        for pid in (99997, 99998, 99999):
+            pc.suspend(pid)
+        assert [a.pid for a in pc.action_log] == [99998, 99999]
+
     def test_block_and_check(self):
         pc = ProcessController()
         # Can't actually block a fake PID, but check the mechanism
@@ -354,12 +419,40 @@ class TestProcessController:
         assert pc.is_blocked("/usr/bin/fake_malware")
         assert not pc.is_blocked("/usr/bin/python")
 
+    def test_is_blocked_normalizes_path(self):
+        pc = ProcessController()
+        pc._blocked.add("/usr/bin/fake_malware")
+        assert pc.is_blocked("/usr/lib/../bin//fake_malware")
+
     def test_blocked_executables_property(self):
         pc = ProcessController()
         pc._blocked.add("/a")
         pc._blocked.add("/b")
         assert pc.blocked_executables == {"/a", "/b"}
 
+    def test_process_handles_reused_while_running(self):
+        pc = ProcessController()
+        assert pc._get(os.getpid()) is pc._get(os.getpid())
+        tree = pc.get_process_tree(os.getpid())
+        assert tree[0]["pid"] == os.getpid()
+
+    def test_process_tree_includes_children(self):
+        import subprocess
+        import sys
+        child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+        try:
+            pc = ProcessController()
+            tree = pc.get_process_tree(os.getpid())
+            assert child.pid in {entry["pid"] for entry in tree[1:]}
+        finally:
+            child.kill()
+            child.wait()
+
+    def test_failed_action_drops_cached_handle(self):
+        pc = ProcessController()
+        pc.suspend(99999)
+        assert 99999 not in pc._procs
+
 
 # ---------------------------------------------------------------------------
 # Recovery workflow
@@ -424,6 +517,12 @@ class TestRecoveryWorkflow:
         wf.create_incident_report(2, "q", 80, {}, [])
         assert len(wf.incidents) == 2
 
+    def test_incidents_keep_most_recent(self, backup_mgr):
+        wf = RecoveryWorkflow(backup_mgr, log_size=1)
+        wf.create_incident_report(1, "p", 50, {}, [])
+        wf.create_incident_report(2, "q", 80, {}, [])
+        assert [r.process_id for r in wf.incidents] == [2]
+
 
 # ---------------------------------------------------------------------------
 # Score 0-30: No response
@@ -448,3 +547,46 @@ class TestResponseLog:
         engine.respond(make_threat(40))
         engine.respond(make_threat(60))
         assert len(engine.response_log) == 3
+
+    def test_log_keeps_most_recent(self, backup_mgr):
+        engine = ResponseEngine(
+            backup_manager=backup_mgr, enable_desktop_alerts=False, log_size=2,
+        )
+        for score in (0, 10, 20):
+            engine.respond(make_threat(score))
+        assert [r.threat_score.score for r in engine.response_log] == [10, 20]
+
+        for score in (35, 40, 45):
+            engine.respond(make_threat(score))
+        assert [r.threat_score.score for r in engine.recent_threats()] == [45, 40]
+        assert [r.threat_score.score for r in engine.recent_threats(1)] == [45, 40]
+
+    def test_recent_threats_by_level(self, engine):
+        engine.respond(make_threat(0))
+        engine.respond(make_threat(40))
+        engine.respond(make_threat(45))
+        engine.respond(make_threat(60))
+        assert [r.threat_score.score for r in engine.recent_threats()] == [60, 45, 40]
+        assert [r.threat_score.score for r in engine.recent_threats(1)] == [45, 40]
+        assert list(engine.recent_threats(0)) == []
+
+    def test_recent_threats_since_and_limit(self, engine):
+        for score in (35, 40, 45, 50):
+            engine.respond(make_threat(score))
+        log = engine.response_log
+        since = log[1].timestamp
+        scores = [r.threat_score.score for r in engine.recent_threats(since=since)]
+        assert scores == [50, 45, 40]
+        assert [r.threat_score.score
+                for r in engine.recent_threats(since=log[-1].timestamp + "Z")] == []
+        assert [r.threat_score.score for r in engine.recent_threats(limit=2)] == [50, 45]
+        assert engine.recent_threats(limit=0) == []
+
+    def test_to_dict_tracks_later_actions(self, engine):
+        result = engine.respond(make_threat(40))
+        first = result.to_dict()
+        assert first["score"] == 40
+        assert first["escalation_level"] == 1
+        result.actions_taken.append("extra")
+        assert result.to_dict()["actions_taken"][-1] == "extra"
+        assert "_api_base" not in first